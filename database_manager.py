@@ -1,33 +1,124 @@
 import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from qgis.PyQt.QtCore import QObject, pyqtSignal
+from psycopg2 import sql
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT, AsIs, make_dsn
+from psycopg2.extras import execute_batch
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+from qgis.PyQt.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
 from qgis.core import QgsMessageLog, Qgis
 import tempfile
 import os
 import zipfile
 import re
 import shutil
+import subprocess
+import threading
+import time
 from datetime import datetime
 
 
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    import xml.etree.ElementTree as etree
+    LXML_AVAILABLE = False
+
+
+# key='value', key="value" or key=value pairs inside a QGIS datasource string
+DATASOURCE_PARAM_RE = re.compile(r"""(\w+)=(?:'([^']*)'|"([^"]*)"|([^\s'"]+))""")
+# Schema part of table="schema"."table" (quoted) or table=schema.table (unquoted)
+DATASOURCE_SCHEMA_RE = re.compile(r"""\btable=(?:"([^"]*)"|([^\s"'.]+))\.""")
+
+# Datasource parameters that are replaced verbatim when a new value is given
+CONNECTION_PARAM_KEYS = ('dbname', 'host', 'port', 'user', 'password')
+
+# Major and minor version in the output of pg_dump --version
+PG_DUMP_VERSION_RE = re.compile(r"(\d+)(?:\.(\d+))?")
+
+# Number of per-table results collected into a single progress message
+PROGRESS_BATCH_SIZE = 25
+
+# Operation identifiers carried by DatabaseManager.operation_finished
+OP_TEST_CONNECTION = 'test_connection'
+OP_CREATE_TEMPLATE = 'create_template'
+OP_DELETE_TEMPLATE = 'delete_template'
+OP_CREATE_DATABASE = 'create_database'
+OP_DELETE_DATABASE = 'delete_database'
+OP_FIX_PROJECT = 'fix_project'
+OP_TRUNCATE = 'truncate'
+
+# Maintenance database used for catalog queries and CREATE/DROP DATABASE
+ADMIN_DATABASE = 'postgres'
+# Upper bound of concurrently checked out maintenance connections
+ADMIN_POOL_MAX_CONNECTIONS = 8
+
+
+class DatabaseTaskSignals(QObject):
+    """Signals emitted by a DatabaseTask."""
+    
+    finished = pyqtSignal(object)  # return value of the task
+    
+
+class DatabaseTask(QRunnable):
+    """Runs a DatabaseManager call on a worker thread of the global thread pool.
+    
+    DatabaseManager reports through operation_finished/progress_updated, which Qt
+    delivers to the GUI thread as queued signals, so the call itself can block on
+    the network without freezing QGIS.
+    """
+    
+    def __init__(self, function, *args, **kwargs):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = DatabaseTaskSignals()
+    
+    def run(self):
+        """Execute the wrapped call and publish its result."""
+        result = None
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as e:
+            QgsMessageLog.logMessage(f"Background database task failed: {str(e)}", 'KGR Toolbox', Qgis.Critical)
+        finally:
+            self.signals.finished.emit(result)
+
+
 class DatabaseManager(QObject):
     """Handles all database operations using psycopg2."""
     
     # Signals
-    operation_finished = pyqtSignal(bool, str)  # success, message
+    operation_finished = pyqtSignal(bool, str, str)  # success, message, operation
     progress_updated = pyqtSignal(str)  # progress message
     
     def __init__(self):
         super().__init__()
         self.connection_params = {}
         self.connection = None
+        self._admin_pool = None
+        self._pool_lock = threading.Lock()
+        # Checked out maintenance connections and the pool each one belongs to
+        self._leases = {}
+        self._dsn_cache = {}
+        # Role privileges of the connected user, looked up once per connection settings
+        self._privileges = None
     
     def log_message(self, message, level=Qgis.Info):
         """Log message to QGIS message log."""
         QgsMessageLog.logMessage(message, 'KGR Toolbox', level)
     
+    def run_in_background(self, function, *args, callback=None, **kwargs):
+        """Run a database call on the thread pool, optionally passing its result to callback."""
+        task = DatabaseTask(function, *args, **kwargs)
+        if callback is not None:
+            task.signals.finished.connect(callback)
+        QThreadPool.globalInstance().start(task)
+        return task
+    
     def set_connection_params(self, host, port, database, username, password):
         """Set connection parameters."""
+        self.close_connections()
         self.connection_params = {
             'host': host,
             'port': port,
@@ -35,32 +126,102 @@ class DatabaseManager(QObject):
             'user': username,
             'password': password
         }
+        self._dsn_cache = {}
+        self._privileges = None
+    
+    def _dsn_for(self, database):
+        """Return the connection string for a database, built once per connection settings."""
+        dsn = self._dsn_cache.get(database)
+        if dsn is None:
+            dsn = make_dsn(**dict(self.connection_params, database=database))
+            self._dsn_cache[database] = dsn
+        return dsn
+    
+    def _get_admin_connection(self):
+        """Check out an autocommit connection to the maintenance database.
+        
+        Only maintenance-database sessions are pooled: an idle session kept open on
+        a user database would block DROP DATABASE and CREATE DATABASE ... TEMPLATE
+        on it, and be killed by drop_database_connections.
+        """
+        with self._pool_lock:
+            if self._admin_pool is None:
+                # getconn() pops the most recently returned connection (LIFO), so a
+                # burst of operations keeps reusing the same warm session
+                self._admin_pool = ThreadedConnectionPool(
+                    1, ADMIN_POOL_MAX_CONNECTIONS, self._dsn_for(ADMIN_DATABASE)
+                )
+            pool = self._admin_pool
+        
+        conn = pool.getconn()
+        with self._pool_lock:
+            self._leases[conn] = pool
+        # CREATE/DROP DATABASE cannot run inside a transaction block
+        conn.autocommit = True
+        return conn
+    
+    def _release_admin_connection(self, conn):
+        """Return a maintenance connection to its pool.
+        
+        The last connection returned to a pool that close_connections retired while
+        it was in use closes that pool.
+        """
+        with self._pool_lock:
+            pool = self._leases.pop(conn, None)
+            close_pool = pool is not self._admin_pool and pool not in self._leases.values()
+        
+        try:
+            if pool is None:
+                raise PoolError("connection pool is closed")
+            pool.putconn(conn)
+            if close_pool:
+                pool.closeall()
+        except PoolError:
+            # Pool was force-closed while this connection was checked out
+            conn.close()
+    
+    def close_connections(self, force=False):
+        """Close all pooled connections.
+        
+        Connections still checked out by a running task are left to finish their
+        statement and the pool is closed once they are returned, unless force is set.
+        """
+        with self._pool_lock:
+            pool = self._admin_pool
+            self._admin_pool = None
+            in_use = pool in self._leases.values()
+        
+        if pool is not None and (force or not in_use):
+            pool.closeall()
     
     def test_connection(self):
         """Test database connection."""
         try:
             self.progress_updated.emit("Testing connection...")
             
-            conn = psycopg2.connect(**self.connection_params)
+            # Validate the database that was actually entered
+            conn = psycopg2.connect(self._dsn_for(self.connection_params['database']))
             conn.close()
             
+            # Look up privileges now, off the GUI thread, so create actions find them cached;
+            # this also opens the pooled maintenance session that the list refreshes after a
+            # successful test reuse, and only logs if that database cannot be reached
+            self.check_user_privileges()
+            
             self.progress_updated.emit("Connection successful!")
-            self.operation_finished.emit(True, "Connection successful!")
+            self.operation_finished.emit(True, "Connection successful!", OP_TEST_CONNECTION)
             return True
             
         except psycopg2.Error as e:
             error_msg = f"Connection failed: {str(e)}"
             self.log_message(error_msg, Qgis.Critical)
-            self.operation_finished.emit(False, error_msg)
+            self.operation_finished.emit(False, error_msg, OP_TEST_CONNECTION)
             return False
     
     def get_databases(self):
         """Get list of non-template databases."""
         try:
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
             try:
@@ -86,7 +247,7 @@ class DatabaseManager(QObject):
                 return []
             finally:
                 cursor.close()
-                conn.close()
+                self._release_admin_connection(conn)
             
         except psycopg2.Error as e:
             self.log_message(f"Error getting databases: {str(e)}", Qgis.Critical)
@@ -95,10 +256,7 @@ class DatabaseManager(QObject):
     def get_templates(self):
         """Get list of template databases."""
         try:
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
             try:
@@ -124,61 +282,70 @@ class DatabaseManager(QObject):
                 return []
             finally:
                 cursor.close()
-                conn.close()
+                self._release_admin_connection(conn)
             
         except psycopg2.Error as e:
             self.log_message(f"Error getting templates: {str(e)}", Qgis.Critical)
             return []
     
     def check_user_privileges(self):
-        """Check user privileges."""
+        """Check user privileges, cached until the connection settings change."""
+        if self._privileges is not None:
+            return self._privileges
+        
         try:
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
             try:
-                # Check if user is superuser
-                cursor.execute("SELECT usesuper FROM pg_user WHERE usename = %s;", (self.connection_params['user'],))
+                # Superuser and CREATEDB flags in one lookup
+                cursor.execute("SELECT usesuper, usecreatedb FROM pg_user WHERE usename = %s;", (self.connection_params['user'],))
                 result = cursor.fetchone()
-                is_superuser = result[0] if result and len(result) > 0 else False
+                is_superuser, can_create_db = result if result else (False, False)
                 
-                # Check CREATEDB privilege
-                cursor.execute("SELECT usecreatedb FROM pg_user WHERE usename = %s;", (self.connection_params['user'],))
-                result = cursor.fetchone()
-                can_create_db = result[0] if result and len(result) > 0 else False
-                
-                return {
+                self._privileges = {
                     'is_superuser': is_superuser,
                     'can_create_db': can_create_db
                 }
+                return self._privileges
                 
             except psycopg2.Error as db_error:
                 self.log_message(f"Database error checking privileges: {str(db_error)}", Qgis.Critical)
                 return {'is_superuser': False, 'can_create_db': False}
             finally:
                 cursor.close()
-                conn.close()
+                self._release_admin_connection(conn)
             
         except psycopg2.Error as e:
             self.log_message(f"Error checking privileges: {str(e)}", Qgis.Critical)
             return {'is_superuser': False, 'can_create_db': False}
     
+    def _drop_database_if_exists(self, cursor, db_name, clear_template_flag=False):
+        """Drop db_name if present without a separate existence check round trip."""
+        if clear_template_flag:
+            # Templates cannot be dropped; ALTER DATABASE fails on a missing database, so
+            # clear the flag from a DO block that checks the catalog server-side
+            cursor.execute("""
+                DO $$
+                BEGIN
+                    IF EXISTS (SELECT 1 FROM pg_database WHERE datname = %(name)s AND datistemplate) THEN
+                        EXECUTE format('ALTER DATABASE %%I IS_TEMPLATE = false', %(name)s);
+                    END IF;
+                END $$;
+            """, {'name': db_name})
+        
+        self.progress_updated.emit(f"Dropping existing database '{db_name}' if present...")
+        cursor.execute(sql.SQL("DROP DATABASE IF EXISTS {};").format(sql.Identifier(db_name)))
+    
     def database_exists(self, db_name):
         """Check if database exists."""
         try:
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
             try:
-                cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s;", (db_name,))
-                result = cursor.fetchone()
-                exists = result is not None
+                cursor.execute("SELECT EXISTS(SELECT 1 FROM pg_database WHERE datname = %s);", (db_name,))
+                exists = cursor.fetchone()[0]
                 
                 return exists
                 
@@ -187,7 +354,7 @@ class DatabaseManager(QObject):
                 return False
             finally:
                 cursor.close()
-                conn.close()
+                self._release_admin_connection(conn)
             
         except psycopg2.Error as e:
             self.log_message(f"Error checking database existence: {str(e)}", Qgis.Critical)
@@ -201,10 +368,7 @@ class DatabaseManager(QObject):
     def get_database_info(self, db_name):
         """Get detailed information about a database."""
         try:
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
             try:
@@ -250,7 +414,7 @@ class DatabaseManager(QObject):
                 return None
             finally:
                 cursor.close()
-                conn.close()
+                self._release_admin_connection(conn)
             
         except psycopg2.Error as e:
             self.log_message(f"Error getting database info: {str(e)}", Qgis.Critical)
@@ -274,21 +438,21 @@ class DatabaseManager(QObject):
             if not self.database_exists(db_name):
                 error_msg = f"Database '{db_name}' does not exist."
                 self.log_message(error_msg, Qgis.Warning)
-                self.operation_finished.emit(False, error_msg)
+                self.operation_finished.emit(False, error_msg, OP_DELETE_DATABASE)
                 return False
             
             # Prevent deletion of system databases
             if self.is_system_database(db_name):
                 error_msg = f"Cannot delete system database '{db_name}'. System databases (postgres, template0, template1) cannot be deleted."
                 self.log_message(error_msg, Qgis.Critical)
-                self.operation_finished.emit(False, error_msg)
+                self.operation_finished.emit(False, error_msg, OP_DELETE_DATABASE)
                 return False
             
             # Prevent deletion of currently connected database
             if self.connection_params.get('database') == db_name:
                 error_msg = f"Cannot delete database '{db_name}' because you are currently connected to it. Please connect to a different database first."
                 self.log_message(error_msg, Qgis.Critical)
-                self.operation_finished.emit(False, error_msg)
+                self.operation_finished.emit(False, error_msg, OP_DELETE_DATABASE)
                 return False
             
             # Get database information for logging
@@ -306,11 +470,10 @@ class DatabaseManager(QObject):
                     if not self.drop_database_connections(db_name):
                         error_msg = f"Failed to drop active connections to database '{db_name}'. Cannot proceed with deletion."
                         self.log_message(error_msg, Qgis.Critical)
-                        self.operation_finished.emit(False, error_msg)
+                        self.operation_finished.emit(False, error_msg, OP_DELETE_DATABASE)
                         return False
                     
                     # Wait a moment for connections to be fully dropped
-                    import time
                     time.sleep(1)
                     
                     # Verify connections are dropped
@@ -318,12 +481,12 @@ class DatabaseManager(QObject):
                     if remaining_connections > 0:
                         error_msg = f"Still {remaining_connections} active connections after termination. Cannot delete database."
                         self.log_message(error_msg, Qgis.Critical)
-                        self.operation_finished.emit(False, error_msg)
+                        self.operation_finished.emit(False, error_msg, OP_DELETE_DATABASE)
                         return False
                 else:
                     error_msg = f"Cannot delete database '{db_name}' because it has {connection_count} active connections. Use 'force_drop_connections=True' to terminate connections first."
                     self.log_message(error_msg, Qgis.Critical)
-                    self.operation_finished.emit(False, error_msg)
+                    self.operation_finished.emit(False, error_msg, OP_DELETE_DATABASE)
                     return False
             
             # ============ DELETION PROCESS ============
@@ -333,36 +496,33 @@ class DatabaseManager(QObject):
             # Log the deletion attempt
             self.log_message(f"CRITICAL: Attempting to delete database '{db_name}' by user '{self.connection_params['user']}'", Qgis.Critical)
             
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
-            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
-            # Execute the deletion
-            cursor.execute(f'DROP DATABASE "{db_name}";')
-            
-            cursor.close()
-            conn.close()
+            try:
+                # Execute the deletion
+                cursor.execute(sql.SQL("DROP DATABASE {};").format(sql.Identifier(db_name)))
+            finally:
+                cursor.close()
+                self._release_admin_connection(conn)
             
             # Log successful deletion
             success_msg = f"✅ Database '{db_name}' has been permanently deleted!"
             self.log_message(f"SUCCESS: Database '{db_name}' deleted successfully by user '{self.connection_params['user']}'", Qgis.Info)
             self.progress_updated.emit(success_msg)
-            self.operation_finished.emit(True, success_msg)
+            self.operation_finished.emit(True, success_msg, OP_DELETE_DATABASE)
             
             return True
             
         except psycopg2.Error as e:
             error_msg = f"❌ Error deleting database '{db_name}': {str(e)}"
             self.log_message(error_msg, Qgis.Critical)
-            self.operation_finished.emit(False, error_msg)
+            self.operation_finished.emit(False, error_msg, OP_DELETE_DATABASE)
             return False
         except Exception as e:
             error_msg = f"❌ Unexpected error deleting database '{db_name}': {str(e)}"
             self.log_message(error_msg, Qgis.Critical)
-            self.operation_finished.emit(False, error_msg)
+            self.operation_finished.emit(False, error_msg, OP_DELETE_DATABASE)
             return False
     
     def find_qgis_projects(self, database_name):
@@ -370,10 +530,7 @@ class DatabaseManager(QObject):
         try:
             self.progress_updated.emit(f"Searching for QGIS projects in '{database_name}'...")
             
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = database_name
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = psycopg2.connect(self._dsn_for(database_name))
             cursor = conn.cursor()
             
             try:
@@ -392,11 +549,11 @@ class DatabaseManager(QObject):
                 projects = []
                 for schema, table in tables:
                     # Get projects from this table
-                    project_query = f"""
+                    project_query = sql.SQL("""
                         SELECT name, metadata 
-                        FROM "{schema}"."{table}"
+                        FROM {}.{}
                         ORDER BY name;
-                    """
+                    """).format(sql.Identifier(schema), sql.Identifier(table))
                     
                     try:
                         cursor.execute(project_query)
@@ -435,13 +592,13 @@ class DatabaseManager(QObject):
             # Step 1: Download project content
             content = self._download_project_content(database_name, schema, table, project_name)
             if not content:
-                self.operation_finished.emit(False, "Failed to download project content")
+                self.operation_finished.emit(False, "Failed to download project content", OP_FIX_PROJECT)
                 return
             
             # Step 2: Process the QGS file (will save both files for comparison)
             fixed_content = self._process_qgs_file(content, new_params, project_name, create_backup)
             if not fixed_content:
-                self.operation_finished.emit(False, "Failed to process QGS file")
+                self.operation_finished.emit(False, "Failed to process QGS file", OP_FIX_PROJECT)
                 return
             
             # Step 3: DISABLED - Upload fixed content back to database
@@ -451,9 +608,9 @@ class DatabaseManager(QObject):
             
             success = self._upload_project_content(database_name, schema, table, project_name, fixed_content)
             if success:
-                self.operation_finished.emit(True, f"Successfully fixed project '{project_name}'")
+                self.operation_finished.emit(True, f"Successfully fixed project '{project_name}'", OP_FIX_PROJECT)
             else:
-                self.operation_finished.emit(False, "Failed to upload fixed project content")
+                self.operation_finished.emit(False, "Failed to upload fixed project content", OP_FIX_PROJECT)
             
             # Instead, just report success with debug info
             # self.operation_finished.emit(True, f"Debug mode: Project '{project_name}' processed successfully. Files saved for comparison. Upload was SKIPPED.")
@@ -461,20 +618,19 @@ class DatabaseManager(QObject):
         except Exception as e:
             error_msg = f"Error fixing QGIS project: {str(e)}"
             self.log_message(error_msg, Qgis.Critical)
-            self.operation_finished.emit(False, error_msg)
+            self.operation_finished.emit(False, error_msg, OP_FIX_PROJECT)
     
     def _download_project_content(self, database_name, schema, table, project_name):
         """Download project content from database."""
         try:
             self.progress_updated.emit(f"Downloading project content...")
             
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = database_name
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = psycopg2.connect(self._dsn_for(database_name))
             cursor = conn.cursor()
             
-            query = f'SELECT content FROM "{schema}"."{table}" WHERE name = %s;'
+            query = sql.SQL("SELECT content FROM {}.{} WHERE name = %s;").format(
+                sql.Identifier(schema), sql.Identifier(table)
+            )
             cursor.execute(query, (project_name,))
             
             result = cursor.fetchone()
@@ -612,7 +768,7 @@ class DatabaseManager(QObject):
                         f.write(f"git diff --no-index \"{original_qgs_path}\" \"{modified_qgs_path}\"\n\n")
                         f.write(f"Connection parameters used for modification:\n")
                         for key, value in new_params.items():
-                            if value.strip():
+                            if str(value).strip():
                                 f.write(f"  {key}: {value}\n")
                     
                     self.progress_updated.emit(f"Created diff instructions: {diff_instructions_path}")
@@ -729,20 +885,16 @@ class DatabaseManager(QObject):
             self.log_message(f"Warning: Could not create backup: {str(e)}", Qgis.Warning)
     
     def _modify_qgs_datasources(self, qgs_path, new_params):
-        """Modify datasource connections in QGS file - manual parsing approach."""
+        """Modify datasource connections in QGS file by editing the parsed XML tree."""
         try:
-            # Read QGS file
-            with open(qgs_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            original_content = content
-            modifications_count = 0
-            
             # Only process parameters that are actually provided and not empty
             params_to_change = {}
             for param_name, new_value in new_params.items():
-                if new_value and new_value.strip():
-                    params_to_change[param_name] = new_value.strip()
+                if isinstance(new_value, str):
+                    if new_value.strip():
+                        params_to_change[param_name] = new_value.strip()
+                elif new_value:
+                    params_to_change[param_name] = new_value
             
             if not params_to_change:
                 self.progress_updated.emit("No parameters to change")
@@ -750,87 +902,36 @@ class DatabaseManager(QObject):
             
             self.progress_updated.emit(f"Will change these parameters: {list(params_to_change.keys())}")
             
-            # Find all datasource tags and their positions
-            datasource_pattern = r'<datasource>([^<]+)</datasource>'
-            matches = list(re.finditer(datasource_pattern, content))
-            
-            # Process matches in reverse order to avoid position shifts
-            for match in reversed(matches):
-                full_match = match.group(0)
-                datasource_content = match.group(1)
-                start_pos = match.start()
-                end_pos = match.end()
-                
-                # Parse the datasource content into key-value pairs
-                original_params = self._parse_datasource_simple(datasource_content)
-                new_params_dict = original_params.copy()
-                datasource_changed = False
-                
-                # Apply only the requested changes
-                if 'dbname' in params_to_change:
-                    if 'dbname' in new_params_dict:
-                        new_params_dict['dbname'] = params_to_change['dbname']
-                        datasource_changed = True
-                
-                if 'host' in params_to_change:
-                    if 'host' in new_params_dict:
-                        new_params_dict['host'] = params_to_change['host']
-                        datasource_changed = True
-                
-                if 'port' in params_to_change:
-                    if 'port' in new_params_dict:
-                        new_params_dict['port'] = params_to_change['port']
-                        datasource_changed = True
-                
-                if 'user' in params_to_change:
-                    if 'user' in new_params_dict:
-                        new_params_dict['user'] = params_to_change['user']
-                        datasource_changed = True
-                
-                if 'password' in params_to_change:
-                    if 'password' in new_params_dict:
-                        new_params_dict['password'] = params_to_change['password']
-                        datasource_changed = True
-                
-                if 'schema' in params_to_change and 'table' in new_params_dict:
-                    # Only change schema part of table parameter
-                    table_value = new_params_dict['table']
-                    if '.' in table_value:
-                        # Handle quoted schema: "old_schema"."table" -> "new_schema"."table"
-                        if table_value.startswith('"'):
-                            parts = table_value.split('"."', 1)
-                            if len(parts) == 2:
-                                new_params_dict['table'] = f'"{params_to_change["schema"]}"."{parts[1]}'
-                                datasource_changed = True
-                        else:
-                            # Handle unquoted schema: old_schema.table -> new_schema.table
-                            parts = table_value.split('.', 1)
-                            if len(parts) == 2:
-                                new_params_dict['table'] = f'{params_to_change["schema"]}.{parts[1]}'
-                                datasource_changed = True
-                
-                if datasource_changed:
-                    modifications_count += 1
-                    
-                    # Rebuild the datasource string preserving original formatting
-                    new_datasource_content = self._rebuild_datasource_simple(datasource_content, new_params_dict)
-                    new_full_datasource = f'<datasource>{new_datasource_content}</datasource>'
-                    
-                    # Replace this specific datasource in the content
-                    content = content[:start_pos] + new_full_datasource + content[end_pos:]
-                    
-                    # Extract table name for logging
-                    table_name = original_params.get('table', 'unknown')
-                    self.progress_updated.emit(f"Updated datasource {modifications_count}: {table_name}")
-                    
-                    # Debug output
-                    self.progress_updated.emit(f"  Original: {datasource_content[:80]}...")
-                    self.progress_updated.emit(f"  Modified: {new_datasource_content[:80]}...")
+            if LXML_AVAILABLE:
+                tree = etree.parse(qgs_path, etree.XMLParser(huge_tree=True))
+            else:
+                tree = etree.parse(qgs_path)
+            
+            modifications_count = 0
+            
+            for element in tree.iter('datasource'):
+                datasource_content = element.text
+                if not datasource_content:
+                    continue
+                
+                new_datasource_content = self._rewrite_datasource(datasource_content, params_to_change)
+                if new_datasource_content == datasource_content:
+                    continue
+                
+                element.text = new_datasource_content
+                modifications_count += 1
+                
+                # Extract table name for logging
+                table_name = self._parse_datasource_simple(datasource_content).get('table', 'unknown')
+                self.progress_updated.emit(f"Updated datasource {modifications_count}: {table_name}")
+                
+                # Debug output
+                self.progress_updated.emit(f"  Original: {datasource_content[:80]}...")
+                self.progress_updated.emit(f"  Modified: {new_datasource_content[:80]}...")
             
             # Write modified content back only if changes were made
-            if content != original_content:
-                with open(qgs_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+            if modifications_count:
+                tree.write(qgs_path, xml_declaration=True, encoding='UTF-8')
                 
                 self.progress_updated.emit(f"Successfully updated {modifications_count} datasource connections")
                 return True
@@ -841,66 +942,91 @@ class DatabaseManager(QObject):
         except Exception as e:
             raise Exception(f"Error modifying QGS datasources: {str(e)}")
     
+    def _rewrite_datasource(self, datasource_content, params_to_change):
+        """Return the datasource string with the requested parameters applied."""
+        original_params = self._parse_datasource_simple(datasource_content)
+        changes = {
+            key: params_to_change[key]
+            for key in CONNECTION_PARAM_KEYS
+            if key in params_to_change and key in original_params
+        }
+        result = self._rebuild_datasource_simple(datasource_content, changes)
+        
+        # The schema is only the first part of the table parameter, so swap it in place
+        schema_match = DATASOURCE_SCHEMA_RE.search(result)
+        if schema_match:
+            group = 1 if schema_match.group(1) is not None else 2
+            current_schema = schema_match.group(group)
+            
+            target_schema = None
+            if 'schema' in params_to_change:
+                target_schema = params_to_change['schema']
+            elif 'schema_remapping' in params_to_change:
+                remapping = params_to_change['schema_remapping']
+                if current_schema == remapping['source']:
+                    target_schema = remapping['target']
+            
+            if target_schema:
+                result = result[:schema_match.start(group)] + target_schema + result[schema_match.end(group):]
+        
+        return result
+    
     def _parse_datasource_simple(self, datasource_content):
         """Simple parser to extract key=value pairs from datasource string."""
         params = {}
         
-        # Use regex to find all key=value pairs, handling quoted and unquoted values
-        patterns = [
-            r"(\w+)='([^']*)'",     # key='value'
-            r'(\w+)="([^"]*)"',     # key="value"  
-            r"(\w+)=([^\s'\"]+)"    # key=value (no quotes, no spaces)
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, datasource_content)
-            for key, value in matches:
-                if key not in params:  # Don't overwrite already found values
-                    params[key] = value
+        # One scan with the precompiled pattern, handling quoted and unquoted values
+        for match in DATASOURCE_PARAM_RE.finditer(datasource_content):
+            key = match.group(1)
+            if key not in params:  # Don't overwrite already found values
+                value = match.group(2)
+                if value is None:
+                    value = match.group(3) if match.group(3) is not None else match.group(4)
+                params[key] = value
         
         return params
     
     def _rebuild_datasource_simple(self, original_datasource, new_params):
         """Rebuild datasource string by replacing only changed parameters."""
-        result = original_datasource
+        parts = []
+        last_end = 0
         
-        # Replace each parameter individually using precise regex
-        for key, new_value in new_params.items():
-            # Try different quote formats
-            patterns_replacements = [
-                (rf"{re.escape(key)}='[^']*'", f"{key}='{new_value}'"),
-                (rf'{re.escape(key)}="[^"]*"', f'{key}="{new_value}"'),
-                (rf"{re.escape(key)}=[^\s'\"]+", f"{key}={new_value}")
-            ]
+        # Single pass over the key=value pairs, keeping each value's original quote style
+        for match in DATASOURCE_PARAM_RE.finditer(original_datasource):
+            key = match.group(1)
+            if key not in new_params:
+                continue
+            
+            if match.group(2) is not None:
+                replacement = f"{key}='{new_params[key]}'"
+            elif match.group(3) is not None:
+                replacement = f'{key}="{new_params[key]}"'
+            else:
+                replacement = f"{key}={new_params[key]}"
             
-            for pattern, replacement in patterns_replacements:
-                new_result = re.sub(pattern, replacement, result)
-                if new_result != result:
-                    result = new_result
-                    break  # Found and replaced, move to next parameter
+            parts.append(original_datasource[last_end:match.start()])
+            parts.append(replacement)
+            last_end = match.end()
         
-        return result
+        parts.append(original_datasource[last_end:])
+        return ''.join(parts)
     
     def _upload_project_content(self, database_name, schema, table, project_name, content):
         """Upload fixed project content back to database."""
         try:
             self.progress_updated.emit("Uploading fixed project...")
             
-            # Ensure content is bytes
-            if not isinstance(content, bytes):
-                if isinstance(content, memoryview):
-                    content = content.tobytes()
-                else:
-                    content = bytes(content)
-            
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = database_name
+            # Buffers are sent as bytea as they are; only other types need a copy
+            if not isinstance(content, (bytes, bytearray, memoryview)):
+                content = bytes(content)
             
-            conn = psycopg2.connect(**conn_params)
+            conn = psycopg2.connect(self._dsn_for(database_name))
             cursor = conn.cursor()
             
-            query = f'UPDATE "{schema}"."{table}" SET content = %s WHERE name = %s;'
-            cursor.execute(query, (content, project_name))
+            query = sql.SQL("UPDATE {}.{} SET content = %s WHERE name = %s;").format(
+                sql.Identifier(schema), sql.Identifier(table)
+            )
+            cursor.execute(query, (psycopg2.Binary(content), project_name))
             
             if cursor.rowcount == 0:
                 raise Exception(f"No project named '{project_name}' was found to update")
@@ -919,10 +1045,7 @@ class DatabaseManager(QObject):
     def get_active_connections(self, database_name):
         """Get list of active connections to a specific database."""
         try:
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
             try:
@@ -954,7 +1077,7 @@ class DatabaseManager(QObject):
                 return []
             finally:
                 cursor.close()
-                conn.close()
+                self._release_admin_connection(conn)
             
         except psycopg2.Error as e:
             self.log_message(f"Error getting active connections: {str(e)}", Qgis.Critical)
@@ -963,10 +1086,7 @@ class DatabaseManager(QObject):
     def get_connection_count(self, database_name):
         """Get count of active connections to a specific database."""
         try:
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
             try:
@@ -989,7 +1109,7 @@ class DatabaseManager(QObject):
                 return 0
             finally:
                 cursor.close()
-                conn.close()
+                self._release_admin_connection(conn)
             
         except psycopg2.Error as e:
             self.log_message(f"Error getting connection count: {str(e)}", Qgis.Critical)
@@ -1000,40 +1120,37 @@ class DatabaseManager(QObject):
         try:
             self.progress_updated.emit(f"Dropping active connections to '{database_name}'...")
             
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
-            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
-            # Get connection details before dropping
-            connections = self.get_active_connections(database_name)
-            
-            if connections:
-                self.progress_updated.emit(f"Found {len(connections)} active connections to drop")
+            try:
+                # Get connection details before dropping
+                connections = self.get_active_connections(database_name)
                 
-                # Log connection details
-                for conn_info in connections:
-                    pid, username, client_addr, client_hostname, client_port, backend_start, state, query = conn_info
-                    self.log_message(f"Dropping connection: PID={pid}, User={username}, Client={client_addr or client_hostname}", Qgis.Info)
-            
-            # Drop all connections to the database (excluding our own)
-            terminate_query = """
-                SELECT pg_terminate_backend(pid) 
-                FROM pg_stat_activity 
-                WHERE datname = %s 
-                AND pid != pg_backend_pid();
-            """
-            
-            cursor.execute(terminate_query, (database_name,))
-            terminated_connections = cursor.fetchall()
-            
-            # Count successful terminations
-            successful_terminations = sum(1 for result in terminated_connections if result[0])
-            
-            cursor.close()
-            conn.close()
+                if connections:
+                    self.progress_updated.emit(f"Found {len(connections)} active connections to drop")
+                    
+                    # Log connection details
+                    for conn_info in connections:
+                        pid, username, client_addr, client_hostname, client_port, backend_start, state, query = conn_info
+                        self.log_message(f"Dropping connection: PID={pid}, User={username}, Client={client_addr or client_hostname}", Qgis.Info)
+            
+                # Drop all connections to the database (excluding our own)
+                terminate_query = """
+                    SELECT pg_terminate_backend(pid) 
+                    FROM pg_stat_activity 
+                    WHERE datname = %s 
+                    AND pid != pg_backend_pid();
+                """
+                
+                cursor.execute(terminate_query, (database_name,))
+                terminated_connections = cursor.fetchall()
+                
+                # Count successful terminations
+                successful_terminations = sum(1 for result in terminated_connections if result[0])
+            finally:
+                cursor.close()
+                self._release_admin_connection(conn)
             
             self.progress_updated.emit(f"Successfully dropped {successful_terminations} connections")
             return True
@@ -1045,8 +1162,14 @@ class DatabaseManager(QObject):
             return False
 
     def create_template(self, source_db, template_name, template_comment=None, 
-                    preserve_qgis_projects=False, excluded_schemas=None):
-        """Create a template from source database with optional comment and data preservation options."""
+                    preserve_qgis_projects=False, excluded_schemas=None, schema_only=False):
+        """Create a template from source database with optional comment and data preservation options.
+        
+        With schema_only, and no data to preserve, the template is restored from a
+        schema-only pg_dump instead of cloned and truncated. That is faster for large
+        databases but, unlike the clone, resets sequences and leaves out rows that
+        extensions keep in their configuration tables (e.g. custom spatial_ref_sys entries).
+        """
         try:
             if excluded_schemas is None:
                 excluded_schemas = []
@@ -1062,6 +1185,23 @@ class DatabaseManager(QObject):
                     preservation_info.append(f"schemas {excluded_schemas} will be preserved")
                 self.progress_updated.emit(f"Data preservation: {'; '.join(preservation_info)}")
             
+            # Without data to preserve, restoring the schema alone avoids copying every row
+            # only to truncate it again
+            if schema_only and (preserve_qgis_projects or excluded_schemas):
+                self.progress_updated.emit("Schema-only copy cannot preserve data, cloning and truncating instead...")
+            elif schema_only and self._schema_dump_supported():
+                if self._create_template_from_schema_dump(source_db, template_name, template_comment):
+                    success_msg = f"Template '{template_name}' created successfully!"
+                    if template_comment:
+                        success_msg += f" Comment: {template_comment}"
+                    success_msg += " (schema only)"
+                    
+                    self.progress_updated.emit(success_msg)
+                    self.operation_finished.emit(True, success_msg, OP_CREATE_TEMPLATE)
+                    return True
+                
+                self.progress_updated.emit("Schema-only copy failed, falling back to cloning and truncating...")
+            
             # Check for active connections first
             connection_count = self.get_connection_count(source_db)
             if connection_count > 0:
@@ -1072,7 +1212,6 @@ class DatabaseManager(QObject):
                     raise Exception("Failed to drop database connections")
                 
                 # Wait a moment for connections to be fully dropped
-                import time
                 time.sleep(1)
                 
                 # Verify connections are dropped
@@ -1080,76 +1219,44 @@ class DatabaseManager(QObject):
                 if remaining_connections > 0:
                     raise Exception(f"Still {remaining_connections} active connections after termination")
             
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
-            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
-            # Drop existing template if it exists
-            if self.database_exists(template_name):
-                self.progress_updated.emit(f"Dropping existing template '{template_name}'...")
-                cursor.execute(f'DROP DATABASE "{template_name}";')
-            
-            # Create template database
-            cursor.execute(f'CREATE DATABASE "{template_name}" WITH TEMPLATE "{source_db}" IS_TEMPLATE = true;')
-            
-            # Add comment if provided
-            if template_comment:
-                self.progress_updated.emit(f"Adding comment to template...")
-                # Escape single quotes in comment
-                escaped_comment = template_comment.replace("'", "''")
-                cursor.execute(f"COMMENT ON DATABASE \"{template_name}\" IS '{escaped_comment}';")
-                self.progress_updated.emit(f"Comment added: {template_comment}")
+            try:
+                # Drop existing template if it exists
+                self._drop_database_if_exists(cursor, template_name, clear_template_flag=True)
+            
+                # Create template database
+                cursor.execute(sql.SQL("CREATE DATABASE {} WITH TEMPLATE {} IS_TEMPLATE = true;").format(
+                    sql.Identifier(template_name), sql.Identifier(source_db)
+                ))
+                
+                # Add comment if provided
+                if template_comment:
+                    self.progress_updated.emit(f"Adding comment to template...")
+                    cursor.execute(sql.SQL("COMMENT ON DATABASE {} IS %s;").format(sql.Identifier(template_name)), (template_comment,))
+                    self.progress_updated.emit(f"Comment added: {template_comment}")
+            finally:
+                cursor.close()
+                self._release_admin_connection(conn)
             
             # Connect to template database to remove data selectively
-            cursor.close()
-            conn.close()
-            
-            template_conn_params = self.connection_params.copy()
-            template_conn_params['database'] = template_name
             
-            template_conn = psycopg2.connect(**template_conn_params)
+            template_conn = psycopg2.connect(self._dsn_for(template_name))
             template_conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
             template_cursor = template_conn.cursor()
             
-            # Get all user tables
-            template_cursor.execute("""
-                SELECT schemaname, tablename 
-                FROM pg_tables 
-                WHERE schemaname NOT IN ('information_schema', 'pg_catalog', 'pg_toast')
-                ORDER BY schemaname, tablename;
-            """)
-            
-            tables = template_cursor.fetchall()
-            
-            # Process tables with selective preservation
-            truncated_count = 0
-            preserved_count = 0
-            
             self.progress_updated.emit("Processing tables with data preservation rules...")
             
-            for schema, table in tables:
-                # Check if this schema should be excluded entirely
-                if schema in excluded_schemas:
-                    self.progress_updated.emit(f"Preserving data in {schema}.{table} (excluded schema)")
-                    preserved_count += 1
-                    continue
-                
-                # Check if this is the qgis_projects table and should be preserved
-                if preserve_qgis_projects and table == 'qgis_projects':
-                    self.progress_updated.emit(f"Preserving data in {schema}.{table} (qgis_projects table)")
-                    preserved_count += 1
-                    continue
-                
-                # Truncate this table
-                try:
-                    template_cursor.execute(f'TRUNCATE TABLE "{schema}"."{table}" CASCADE;')
-                    self.progress_updated.emit(f"Cleared data from {schema}.{table}")
-                    truncated_count += 1
-                except psycopg2.Error as e:
-                    self.log_message(f"Warning: Could not truncate {schema}.{table}: {str(e)}", Qgis.Warning)
+            try:
+                truncated_count, preserved_count = self._clear_template_data_server_side(
+                    template_cursor, preserve_qgis_projects, excluded_schemas
+                )
+            except psycopg2.Error as e:
+                self.log_message(f"Warning: Server-side truncate failed, clearing tables from the client: {str(e)}", Qgis.Warning)
+                truncated_count, preserved_count = self._clear_template_data_client_side(
+                    template_conn, template_cursor, preserve_qgis_projects, excluded_schemas
+                )
             
             template_cursor.close()
             template_conn.close()
@@ -1169,14 +1276,276 @@ class DatabaseManager(QObject):
                 success_msg += f" ({', '.join(details)})"
             
             self.progress_updated.emit(success_msg)
-            self.operation_finished.emit(True, success_msg)
+            self.operation_finished.emit(True, success_msg, OP_CREATE_TEMPLATE)
             return True
             
-        except psycopg2.Error as e:
+        except Exception as e:
             error_msg = f"Error creating template: {str(e)}"
             self.log_message(error_msg, Qgis.Critical)
-            self.operation_finished.emit(False, error_msg)
+            self.operation_finished.emit(False, error_msg, OP_CREATE_TEMPLATE)
+            return False
+    
+    def _clear_template_data_server_side(self, cursor, preserve_qgis_projects, excluded_schemas):
+        """Find and truncate the template's tables in one DO block; return (truncated, preserved) counts."""
+        cursor.connection.notices.clear()
+        cursor.execute("""
+            DO $$
+            DECLARE
+                truncate_list text;
+                truncate_count integer;
+                preserved_list text;
+                preserved_count integer;
+            BEGIN
+                SELECT string_agg(format('%%I.%%I', nspname, relname), ', ' ORDER BY nspname, relname)
+                           FILTER (WHERE reason IS NULL),
+                       count(*) FILTER (WHERE reason IS NULL),
+                       string_agg(format('%%s.%%s (%%s)', nspname, relname, reason), ', ' ORDER BY nspname, relname)
+                           FILTER (WHERE reason IS NOT NULL),
+                       count(*) FILTER (WHERE reason IS NOT NULL)
+                INTO truncate_list, truncate_count, preserved_list, preserved_count
+                FROM (
+                    SELECT n.nspname, c.relname,
+                           CASE
+                               WHEN n.nspname = ANY(%(excluded_schemas)s::text[]) THEN 'excluded schema'
+                               WHEN %(preserve_qgis_projects)s AND c.relname = 'qgis_projects' THEN 'qgis_projects table'
+                           END AS reason
+                    FROM pg_class c
+                    JOIN pg_namespace n ON n.oid = c.relnamespace
+                    WHERE c.relkind IN ('r', 'p')
+                    AND n.nspname NOT IN ('information_schema', 'pg_catalog', 'pg_toast')
+                ) AS user_tables;
+                
+                IF preserved_list IS NOT NULL THEN
+                    RAISE NOTICE 'preserved:%%', preserved_list;
+                END IF;
+                IF truncate_list IS NOT NULL THEN
+                    EXECUTE 'TRUNCATE TABLE ' || truncate_list || ' CASCADE';
+                END IF;
+                RAISE NOTICE 'counts:%%,%%', truncate_count, preserved_count;
+            END $$;
+        """, {
+            'excluded_schemas': list(excluded_schemas),
+            'preserve_qgis_projects': bool(preserve_qgis_projects),
+        })
+        
+        # Results come back as notices since a DO block cannot return rows
+        truncated_count = preserved_count = 0
+        for notice in cursor.connection.notices:
+            text = notice.split(':', 1)[-1].strip()
+            if text.startswith('preserved:'):
+                self.progress_updated.emit(f"Preserving data in: {text[len('preserved:'):]}")
+            elif text.startswith('counts:'):
+                truncated, preserved = text[len('counts:'):].split(',')
+                truncated_count, preserved_count = int(truncated), int(preserved)
+        cursor.connection.notices.clear()
+        
+        if truncated_count:
+            self.progress_updated.emit(f"Truncated {truncated_count} tables")
+        return truncated_count, preserved_count
+    
+    def _clear_template_data_client_side(self, conn, cursor, preserve_qgis_projects, excluded_schemas):
+        """List the template's tables and truncate them from the client; return (truncated, preserved) counts."""
+        # Get all user tables straight from pg_class (pg_tables adds joins we don't need)
+        cursor.execute("""
+            SELECT n.nspname, c.relname 
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relkind IN ('r', 'p')
+            AND n.nspname NOT IN ('information_schema', 'pg_catalog', 'pg_toast')
+            ORDER BY n.nspname, c.relname;
+        """)
+        
+        tables = cursor.fetchall()
+        
+        # Process tables with selective preservation
+        truncated_count = 0
+        
+        tables_to_truncate = []
+        preserved_tables = []
+        for schema, table in tables:
+            # Check if this schema should be excluded entirely
+            if schema in excluded_schemas:
+                preserved_tables.append(f"{schema}.{table} (excluded schema)")
+                continue
+            
+            # Check if this is the qgis_projects table and should be preserved
+            if preserve_qgis_projects and table == 'qgis_projects':
+                preserved_tables.append(f"{schema}.{table} (qgis_projects table)")
+                continue
+            
+            tables_to_truncate.append((schema, table))
+        
+        preserved_count = len(preserved_tables)
+        if preserved_tables:
+            self.progress_updated.emit(f"Preserving data in: {', '.join(preserved_tables)}")
+        
+        if tables_to_truncate:
+            # One TRUNCATE for all tables lets PostgreSQL resolve the CASCADE graph once
+            try:
+                truncate_query = sql.SQL("TRUNCATE TABLE {} CASCADE;").format(
+                    sql.SQL(", ").join(sql.Identifier(schema, table) for schema, table in tables_to_truncate)
+                )
+                cursor.execute(truncate_query)
+                truncated_count = len(tables_to_truncate)
+                self.progress_updated.emit(f"Truncated {truncated_count} tables")
+            except psycopg2.Error as e:
+                self.log_message(f"Warning: Batch truncate failed, truncating tables in smaller batches: {str(e)}", Qgis.Warning)
+                
+                truncated_count = self._truncate_tables_in_pages(conn, cursor, tables_to_truncate)
+        
+        return truncated_count, preserved_count
+    
+    def _truncate_tables_in_pages(self, conn, cursor, tables):
+        """Truncate tables a page at a time, retrying a failed page table by table."""
+        truncated_count = 0
+        for start in range(0, len(tables), PROGRESS_BATCH_SIZE):
+            page = tables[start:start + PROGRESS_BATCH_SIZE]
+            # Identifiers cannot be bound as parameters, so pass them pre-quoted
+            args = [(AsIs(sql.Identifier(schema, table).as_string(conn)),) for schema, table in page]
+            try:
+                execute_batch(cursor, "TRUNCATE TABLE %s CASCADE", args, page_size=PROGRESS_BATCH_SIZE)
+                cleared_tables = [f"{schema}.{table}" for schema, table in page]
+            except psycopg2.Error:
+                # The page ran as one implicit transaction, so nothing in it was truncated
+                cleared_tables = []
+                for schema, table in page:
+                    try:
+                        cursor.execute(
+                            sql.SQL("TRUNCATE TABLE {} CASCADE;").format(sql.Identifier(schema, table))
+                        )
+                        cleared_tables.append(f"{schema}.{table}")
+                    except psycopg2.Error as e:
+                        self.log_message(f"Warning: Could not truncate {schema}.{table}: {str(e)}", Qgis.Warning)
+            
+            if cleared_tables:
+                truncated_count += len(cleared_tables)
+                self.progress_updated.emit(f"Cleared data from: {', '.join(cleared_tables)}")
+        
+        return truncated_count
+    
+    def _schema_dump_supported(self):
+        """Check whether pg_dump and psql can be run here and pg_dump can dump the server.
+        
+        pg_dump refuses servers of a newer major version than its own, which would
+        otherwise only show after a template database had been created for nothing.
+        """
+        if shutil.which('pg_dump') is None or shutil.which('psql') is None:
+            self.progress_updated.emit("pg_dump/psql not found, cloning and truncating instead...")
             return False
+        
+        try:
+            output = subprocess.run(
+                ['pg_dump', '--version'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0), check=True
+            ).stdout.decode('ascii', errors='replace')
+            match = PG_DUMP_VERSION_RE.search(output)
+            
+            conn = self._get_admin_connection()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SHOW server_version_num;")
+                server_version = int(cursor.fetchone()[0])
+            finally:
+                cursor.close()
+                self._release_admin_connection(conn)
+        except (psycopg2.Error, OSError, subprocess.CalledProcessError) as e:
+            self.log_message(f"Could not compare pg_dump and server versions: {str(e)}", Qgis.Warning)
+            return False
+        
+        if match is None:
+            return False
+        # Major versions are 10, 11, ... from PostgreSQL 10 on and 9.6, 9.5, ... before
+        major, minor = int(match.group(1)), int(match.group(2) or 0)
+        dump_major = major * 100 if major >= 10 else major * 100 + minor
+        server_major = server_version // 10000 * 100 if server_version >= 100000 else server_version // 100
+        if dump_major < server_major:
+            self.progress_updated.emit("pg_dump is older than the server, cloning and truncating instead...")
+            return False
+        return True
+    
+    def _create_template_from_schema_dump(self, source_db, template_name, template_comment=None):
+        """Create an empty template by piping a schema-only pg_dump of source_db into psql."""
+        conn = self._get_admin_connection()
+        cursor = conn.cursor()
+        created = False
+        
+        try:
+            # Match the source encoding and locale, template0 is the only safe base for a restore
+            cursor.execute(
+                "SELECT pg_encoding_to_char(encoding), datcollate, datctype FROM pg_database WHERE datname = %s;",
+                (source_db,)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                raise Exception(f"Source database '{source_db}' not found")
+            encoding, collate, ctype = row
+            
+            self._drop_database_if_exists(cursor, template_name, clear_template_flag=True)
+            
+            cursor.execute(
+                sql.SQL("CREATE DATABASE {} WITH TEMPLATE template0 ENCODING %s LC_COLLATE %s LC_CTYPE %s;").format(
+                    sql.Identifier(template_name)
+                ),
+                (encoding, collate, ctype)
+            )
+            created = True
+            
+            self.progress_updated.emit(f"Restoring schema of '{source_db}' into '{template_name}'...")
+            
+            connection_args = [
+                '--host', str(self.connection_params['host']),
+                '--port', str(self.connection_params['port']),
+                '--username', self.connection_params['user'],
+                '--no-password'
+            ]
+            env = os.environ.copy()
+            env['PGPASSWORD'] = self.connection_params.get('password') or ''
+            # Keep Windows from flashing a console window for each process
+            creationflags = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+            
+            with tempfile.TemporaryFile() as dump_errors:
+                dump = subprocess.Popen(
+                    ['pg_dump', '--schema-only', *connection_args, '--dbname', source_db],
+                    stdout=subprocess.PIPE, stderr=dump_errors, env=env, creationflags=creationflags
+                )
+                restore = subprocess.Popen(
+                    ['psql', '--quiet', '--no-psqlrc', '--set', 'ON_ERROR_STOP=1',
+                     *connection_args, '--dbname', template_name],
+                    stdin=dump.stdout, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                    env=env, creationflags=creationflags
+                )
+                dump.stdout.close()
+                _, restore_errors = restore.communicate()
+                dump.wait()
+                
+                dump_errors.seek(0)
+                errors = (dump_errors.read() + restore_errors).decode('utf-8', errors='replace').strip()
+            
+            if dump.returncode != 0 or restore.returncode != 0:
+                self.log_message(f"Schema-only copy of '{source_db}' failed: {errors}", Qgis.Warning)
+                cursor.execute(sql.SQL("DROP DATABASE IF EXISTS {};").format(sql.Identifier(template_name)))
+                return False
+            
+            cursor.execute(sql.SQL("ALTER DATABASE {} IS_TEMPLATE = true;").format(sql.Identifier(template_name)))
+            
+            if template_comment:
+                self.progress_updated.emit(f"Adding comment to template...")
+                cursor.execute(sql.SQL("COMMENT ON DATABASE {} IS %s;").format(sql.Identifier(template_name)), (template_comment,))
+                self.progress_updated.emit(f"Comment added: {template_comment}")
+            
+            return True
+            
+        except (psycopg2.Error, OSError) as e:
+            self.log_message(f"Schema-only copy of '{source_db}' failed: {str(e)}", Qgis.Warning)
+            if created:
+                try:
+                    cursor.execute(sql.SQL("DROP DATABASE IF EXISTS {};").format(sql.Identifier(template_name)))
+                except psycopg2.Error:
+                    pass
+            return False
+        finally:
+            cursor.close()
+            self._release_admin_connection(conn)
     
     def create_database_from_template(self, template_name, new_db_name, db_comment=None):
         """Create a new database from template with optional comment."""
@@ -1193,7 +1562,6 @@ class DatabaseManager(QObject):
                     raise Exception("Failed to drop database connections to template")
                 
                 # Wait a moment for connections to be fully dropped
-                import time
                 time.sleep(1)
                 
                 # Verify connections are dropped
@@ -1201,44 +1569,39 @@ class DatabaseManager(QObject):
                 if remaining_connections > 0:
                     raise Exception(f"Still {remaining_connections} active connections to template after termination")
             
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
-            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
-            # Drop existing database if it exists
-            if self.database_exists(new_db_name):
-                self.progress_updated.emit(f"Dropping existing database '{new_db_name}'...")
-                cursor.execute(f'DROP DATABASE "{new_db_name}";')
-            
-            # Create database from template
-            cursor.execute(f'CREATE DATABASE "{new_db_name}" WITH TEMPLATE "{template_name}";')
-            
-            # Add comment if provided
-            if db_comment:
-                self.progress_updated.emit(f"Adding comment to database...")
-                # Escape single quotes in comment
-                escaped_comment = db_comment.replace("'", "''")
-                cursor.execute(f"COMMENT ON DATABASE \"{new_db_name}\" IS '{escaped_comment}';")
-                self.progress_updated.emit(f"Comment added: {db_comment}")
-            
-            cursor.close()
-            conn.close()
+            try:
+                # Drop existing database if it exists
+                self._drop_database_if_exists(cursor, new_db_name)
+            
+                # Create database from template
+                cursor.execute(sql.SQL("CREATE DATABASE {} WITH TEMPLATE {};").format(
+                    sql.Identifier(new_db_name), sql.Identifier(template_name)
+                ))
+                
+                # Add comment if provided
+                if db_comment:
+                    self.progress_updated.emit(f"Adding comment to database...")
+                    cursor.execute(sql.SQL("COMMENT ON DATABASE {} IS %s;").format(sql.Identifier(new_db_name)), (db_comment,))
+                    self.progress_updated.emit(f"Comment added: {db_comment}")
+            finally:
+                cursor.close()
+                self._release_admin_connection(conn)
             
             success_msg = f"Database '{new_db_name}' created successfully from template '{template_name}'!"
             if db_comment:
                 success_msg += f" Comment: {db_comment}"
             
             self.progress_updated.emit(success_msg)
-            self.operation_finished.emit(True, success_msg)
+            self.operation_finished.emit(True, success_msg, OP_CREATE_DATABASE)
             return True
             
-        except psycopg2.Error as e:
+        except Exception as e:
             error_msg = f"Error creating database: {str(e)}"
             self.log_message(error_msg, Qgis.Critical)
-            self.operation_finished.emit(False, error_msg)
+            self.operation_finished.emit(False, error_msg, OP_CREATE_DATABASE)
             return False    
 
     def delete_template(self, template_name):
@@ -1246,40 +1609,34 @@ class DatabaseManager(QObject):
         try:
             self.progress_updated.emit(f"Deleting template '{template_name}'...")
             
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
-            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
-            # Deactivate template status
-            cursor.execute(f"UPDATE pg_database SET datistemplate = false WHERE datname = '{template_name}';")
-            
-            # Drop database
-            cursor.execute(f'DROP DATABASE "{template_name}";')
-            
-            cursor.close()
-            conn.close()
+            try:
+                # Deactivate template status (DROP DATABASE refuses template databases)
+                cursor.execute(sql.SQL("ALTER DATABASE {} IS_TEMPLATE = false;").format(sql.Identifier(template_name)))
+                
+                # Drop database
+                cursor.execute(sql.SQL("DROP DATABASE {};").format(sql.Identifier(template_name)))
+            finally:
+                cursor.close()
+                self._release_admin_connection(conn)
             
             success_msg = f"Template '{template_name}' deleted successfully!"
             self.progress_updated.emit(success_msg)
-            self.operation_finished.emit(True, success_msg)
+            self.operation_finished.emit(True, success_msg, OP_DELETE_TEMPLATE)
             return True
             
-        except psycopg2.Error as e:
+        except Exception as e:
             error_msg = f"Error deleting template: {str(e)}"
             self.log_message(error_msg, Qgis.Critical)
-            self.operation_finished.emit(False, error_msg)
+            self.operation_finished.emit(False, error_msg, OP_DELETE_TEMPLATE)
             return False
 
     def get_templates_with_comments(self):
         """Get list of template databases with their comments."""
         try:
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
             try:
@@ -1308,7 +1665,7 @@ class DatabaseManager(QObject):
                 return []
             finally:
                 cursor.close()
-                conn.close()
+                self._release_admin_connection(conn)
             
         except psycopg2.Error as e:
             self.log_message(f"Error getting templates with comments: {str(e)}", Qgis.Critical)
@@ -1317,10 +1674,7 @@ class DatabaseManager(QObject):
     def get_database_comment(self, db_name):
         """Get comment for a specific database."""
         try:
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
             try:
@@ -1340,7 +1694,7 @@ class DatabaseManager(QObject):
                 return None
             finally:
                 cursor.close()
-                conn.close()
+                self._release_admin_connection(conn)
             
         except psycopg2.Error as e:
             self.log_message(f"Error getting database comment: {str(e)}", Qgis.Critical)
@@ -1349,10 +1703,7 @@ class DatabaseManager(QObject):
     def get_databases_with_comments(self):
         """Get list of non-template databases with their comments."""
         try:
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
             try:
@@ -1381,7 +1732,7 @@ class DatabaseManager(QObject):
                 return []
             finally:
                 cursor.close()
-                conn.close()
+                self._release_admin_connection(conn)
             
         except psycopg2.Error as e:
             self.log_message(f"Error getting databases with comments: {str(e)}", Qgis.Critical)
@@ -1402,7 +1753,6 @@ class DatabaseManager(QObject):
                     raise Exception("Failed to drop database connections to source database")
                 
                 # Wait a moment for connections to be fully dropped
-                import time
                 time.sleep(1)
                 
                 # Verify connections are dropped
@@ -1410,44 +1760,39 @@ class DatabaseManager(QObject):
                 if remaining_connections > 0:
                     raise Exception(f"Still {remaining_connections} active connections to source database after termination")
             
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = 'postgres'
-            
-            conn = psycopg2.connect(**conn_params)
-            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            conn = self._get_admin_connection()
             cursor = conn.cursor()
             
-            # Drop existing database if it exists
-            if self.database_exists(new_db_name):
-                self.progress_updated.emit(f"Dropping existing database '{new_db_name}'...")
-                cursor.execute(f'DROP DATABASE "{new_db_name}";')
-            
-            # Create database from source database (includes data)
-            cursor.execute(f'CREATE DATABASE "{new_db_name}" WITH TEMPLATE "{source_db_name}";')
-            
-            # Add comment if provided
-            if db_comment:
-                self.progress_updated.emit(f"Adding comment to database...")
-                # Escape single quotes in comment
-                escaped_comment = db_comment.replace("'", "''")
-                cursor.execute(f"COMMENT ON DATABASE \"{new_db_name}\" IS '{escaped_comment}';")
-                self.progress_updated.emit(f"Comment added: {db_comment}")
-            
-            cursor.close()
-            conn.close()
+            try:
+                # Drop existing database if it exists
+                self._drop_database_if_exists(cursor, new_db_name)
+            
+                # Create database from source database (includes data)
+                cursor.execute(sql.SQL("CREATE DATABASE {} WITH TEMPLATE {};").format(
+                    sql.Identifier(new_db_name), sql.Identifier(source_db_name)
+                ))
+                
+                # Add comment if provided
+                if db_comment:
+                    self.progress_updated.emit(f"Adding comment to database...")
+                    cursor.execute(sql.SQL("COMMENT ON DATABASE {} IS %s;").format(sql.Identifier(new_db_name)), (db_comment,))
+                    self.progress_updated.emit(f"Comment added: {db_comment}")
+            finally:
+                cursor.close()
+                self._release_admin_connection(conn)
             
             success_msg = f"Database '{new_db_name}' created successfully from existing database '{source_db_name}'!"
             if db_comment:
                 success_msg += f" Comment: {db_comment}"
             
             self.progress_updated.emit(success_msg)
-            self.operation_finished.emit(True, success_msg)
+            self.operation_finished.emit(True, success_msg, OP_CREATE_DATABASE)
             return True
             
-        except psycopg2.Error as e:
+        except Exception as e:
             error_msg = f"Error creating database from existing database: {str(e)}"
             self.log_message(error_msg, Qgis.Critical)
-            self.operation_finished.emit(False, error_msg)
+            self.operation_finished.emit(False, error_msg, OP_CREATE_DATABASE)
             return False
         
     def get_database_schemas(self, database_name):
@@ -1457,10 +1802,7 @@ class DatabaseManager(QObject):
                 self.log_message(f"Invalid database_name: {database_name}", Qgis.Critical)
                 return []
             
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = database_name
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = psycopg2.connect(self._dsn_for(database_name))
             cursor = conn.cursor()
             
             try:
@@ -1512,10 +1854,7 @@ class DatabaseManager(QObject):
             
             self.progress_updated.emit(f"Getting tables for schema '{schema_name}' in database '{database_name}'...")
             
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = database_name
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = psycopg2.connect(self._dsn_for(database_name))
             cursor = conn.cursor()
             
             try:
@@ -1534,19 +1873,15 @@ class DatabaseManager(QObject):
                     self.log_message(f"Schema '{schema_name}' does not exist in database '{database_name}'", Qgis.Warning)
                     return []
                 
-                # Use string formatting approach (safe because we validated schema_name)
-                # Escape single quotes in schema_name to prevent SQL injection
-                safe_schema_name = schema_name.replace("'", "''")
-                
-                query = f"""
+                query = """
                     SELECT tablename 
                     FROM pg_tables 
-                    WHERE schemaname = '{safe_schema_name}'
-                    AND tablename NOT LIKE 'pg_%'
+                    WHERE schemaname = %s
+                    AND tablename NOT LIKE 'pg_%%'
                     ORDER BY tablename;
                 """
                 
-                cursor.execute(query)
+                cursor.execute(query, (schema_name,))
                 results = cursor.fetchall()
                 
                 # Process the results safely
@@ -1579,10 +1914,7 @@ class DatabaseManager(QObject):
                 self.log_message(f"Invalid database_name: {database_name}", Qgis.Critical)
                 return []
             
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = database_name
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = psycopg2.connect(self._dsn_for(database_name))
             cursor = conn.cursor()
             
             try:
@@ -1623,10 +1955,7 @@ class DatabaseManager(QObject):
         try:
             self.progress_updated.emit(f"Truncating {len(table_names)} tables in schema '{schema_name}' of database '{database_name}'...")
             
-            conn_params = self.connection_params.copy()
-            conn_params['database'] = database_name
-            
-            conn = psycopg2.connect(**conn_params)
+            conn = psycopg2.connect(self._dsn_for(database_name))
             conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
             cursor = conn.cursor()
             
@@ -1637,7 +1966,7 @@ class DatabaseManager(QObject):
                 for table_name in table_names:
                     try:
                         # Use CASCADE to handle foreign key constraints
-                        cursor.execute(f'TRUNCATE TABLE "{schema_name}"."{table_name}" CASCADE;')
+                        cursor.execute(sql.SQL("TRUNCATE TABLE {} CASCADE;").format(sql.Identifier(schema_name, table_name)))
                         truncated_count += 1
                         self.progress_updated.emit(f"Truncated: {schema_name}.{table_name}")
                         
@@ -1653,17 +1982,17 @@ class DatabaseManager(QObject):
                         success_msg += f" (Failed: {len(failed_tables)} table(s))"
                     
                     self.progress_updated.emit(success_msg)
-                    self.operation_finished.emit(True, success_msg)
+                    self.operation_finished.emit(True, success_msg, OP_TRUNCATE)
                     return True
                 else:
                     error_msg = f"No tables were truncated in schema '{schema_name}'"
-                    self.operation_finished.emit(False, error_msg)
+                    self.operation_finished.emit(False, error_msg, OP_TRUNCATE)
                     return False
                     
             except psycopg2.Error as db_error:
                 error_msg = f"Database error truncating tables in schema '{schema_name}': {str(db_error)}"
                 self.log_message(error_msg, Qgis.Critical)
-                self.operation_finished.emit(False, error_msg)
+                self.operation_finished.emit(False, error_msg, OP_TRUNCATE)
                 return False
             finally:
                 cursor.close()
@@ -1672,5 +2001,5 @@ class DatabaseManager(QObject):
         except psycopg2.Error as e:
             error_msg = f"Error truncating tables in schema '{schema_name}': {str(e)}"
             self.log_message(error_msg, Qgis.Critical)
-            self.operation_finished.emit(False, error_msg)
+            self.operation_finished.emit(False, error_msg, OP_TRUNCATE)
             return False
\ No newline at end of file
@@ -2,29 +2,58 @@
 Main dialog for KGR Toolbox.
 """
 
-from qgis.PyQt.QtCore import Qt
+import os
+from collections import deque
+
+from qgis.PyQt.QtCore import Qt, QTimer
 from qgis.PyQt.QtWidgets import (QDockWidget, QVBoxLayout, QHBoxLayout, QWidget, QLabel, 
-                                QTabWidget, QGroupBox, QProgressBar, QTextEdit, QPushButton)
+                                QTabWidget, QGroupBox, QProgressBar, QPlainTextEdit, QPushButton)
 from qgis.PyQt.QtGui import QFont
 
-from .tabs import ConnectionTab, TemplatesTab, DatabasesTab, TruncateTablesTab, QGISProjectsTab, ArchiveProjectTab, CleanQGSTab
+from . import tabs
+from .tabs import LogBus, ConnectionTab, TemplatesTab, DatabasesTab
 
 
 class KgrToolBoxDialog(QDockWidget):
     """Main dialog for KGR Toolbox."""
     
+    # Built on first use; a QFont needs the running QApplication
+    _TITLE_FONT = None
+    
     def __init__(self, db_manager, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
         self.dock_area = Qt.LeftDockWidgetArea
         
+        # Log messages waiting to be written to the log area in one batch
+        self._pending_log_messages = deque()
+        self._log_flush_timer = QTimer(self)
+        self._log_flush_timer.setSingleShot(True)
+        self._log_flush_timer.setInterval(50)
+        self._log_flush_timer.timeout.connect(self._flush_log)
+        
         # Connect main database manager signals
         self.db_manager.operation_finished.connect(self.on_operation_finished)
         self.db_manager.progress_updated.connect(self.on_progress_updated)
         
+        # Single bus shared by all tabs for log and progress signals
+        self.log_bus = LogBus(self)
+        self.log_bus.log_message.connect(self.log_message)
+        self.log_bus.progress_started.connect(self.show_progress)
+        self.log_bus.progress_finished.connect(self.hide_progress)
+        
         self.setup_ui()
         self.connect_tab_signals()
     
+    @classmethod
+    def _title_font(cls):
+        """Return the title font, built once and shared by every dialog instance."""
+        if cls._TITLE_FONT is None:
+            cls._TITLE_FONT = QFont()
+            cls._TITLE_FONT.setBold(True)
+            cls._TITLE_FONT.setPointSize(12)
+        return cls._TITLE_FONT
+    
     def setup_ui(self):
         """Setup the user interface."""
         self.setObjectName("KgrToolbox")
@@ -39,37 +68,82 @@ class KgrToolBoxDialog(QDockWidget):
         # Title
         title = QLabel("KGR Toolbox")
         title.setAlignment(Qt.AlignCenter)
-        font = QFont()
-        font.setBold(True)
-        font.setPointSize(12)
-        title.setFont(font)
+        title.setFont(self._title_font())
         layout.addWidget(title)
         
         # Tab widget
         self.tab_widget = QTabWidget()
         layout.addWidget(self.tab_widget)
         
-        # Create tabs
+        # Create tabs; connection, templates and databases drive the data refreshes
+        # after connecting, so they are built right away
         self.connection_tab = ConnectionTab(self.db_manager, self)
         self.templates_tab = TemplatesTab(self.db_manager, self)
         self.databases_tab = DatabasesTab(self.db_manager, self)
-        self.truncate_tab = TruncateTablesTab(self.db_manager, self)
-        self.qgis_projects_tab = QGISProjectsTab(self.db_manager, self)
-        self.archive_project_tab = ArchiveProjectTab(self.db_manager, self)
-        self.clean_qgs_tab = CleanQGSTab(self.db_manager, self)
+        
+        # The remaining tabs are built the first time they are shown
+        self.qgis_projects_tab = None
+        self.truncate_tab = None
+        self.archive_project_tab = None
+        self.clean_qgs_tab = None
+        self._databases = None
 
         # Add tabs to widget
         self.tab_widget.addTab(self.connection_tab, "Connection")
         self.tab_widget.addTab(self.templates_tab, "Templates")
         self.tab_widget.addTab(self.databases_tab, "Databases")
-        self.tab_widget.addTab(self.qgis_projects_tab, "Fix QGIS Project Layers")
-        self.tab_widget.addTab(self.truncate_tab, "Truncate Tables")
-        self.tab_widget.addTab(self.archive_project_tab, "Archive Project")
-        self.tab_widget.addTab(self.clean_qgs_tab, "Clean QGS Files")
+        self._tab_builders = {
+            self.tab_widget.addTab(self._create_tab_placeholder(), "Fix QGIS Project Layers"): self._build_qgis_projects_tab,
+            self.tab_widget.addTab(self._create_tab_placeholder(), "Truncate Tables"): self._build_truncate_tab,
+            self.tab_widget.addTab(self._create_tab_placeholder(), "Archive Project"): self._build_archive_project_tab,
+            self.tab_widget.addTab(self._create_tab_placeholder(), "Clean QGS Files"): self._build_clean_qgs_tab,
+        }
+        self.tab_widget.currentChanged.connect(self._ensure_tab_built)
 
         # Progress section
         self.setup_progress_section(layout)
     
+    def _create_tab_placeholder(self):
+        """Create an empty page that receives a lazily built tab."""
+        placeholder = QWidget()
+        placeholder_layout = QVBoxLayout(placeholder)
+        placeholder_layout.setContentsMargins(0, 0, 0, 0)
+        return placeholder
+    
+    def _ensure_tab_built(self, index):
+        """Build the tab at index the first time it is shown."""
+        builder = self._tab_builders.pop(index, None)
+        if builder is not None:
+            self.tab_widget.widget(index).layout().addWidget(builder())
+    
+    def _build_qgis_projects_tab(self):
+        """Build the QGIS projects tab."""
+        self.qgis_projects_tab = tabs.QGISProjectsTab(self.db_manager, self)
+        self.qgis_projects_tab.projects_found.connect(self.on_projects_found)
+        if self._databases is not None:
+            self.qgis_projects_tab.refresh_qgis_databases(self._databases)
+        return self.qgis_projects_tab
+    
+    def _build_truncate_tab(self):
+        """Build the truncate tables tab."""
+        self.truncate_tab = tabs.TruncateTablesTab(self.db_manager, self)
+        self.truncate_tab.tables_truncated.connect(self.on_tables_truncated)
+        if self._databases is not None:
+            self.truncate_tab.refresh_databases(self._databases)
+        return self.truncate_tab
+    
+    def _build_archive_project_tab(self):
+        """Build the archive project tab."""
+        self.archive_project_tab = tabs.ArchiveProjectTab(self.db_manager, self)
+        self.archive_project_tab.project_archived.connect(self.on_project_archived)
+        return self.archive_project_tab
+    
+    def _build_clean_qgs_tab(self):
+        """Build the clean QGS files tab."""
+        self.clean_qgs_tab = tabs.CleanQGSTab(self.db_manager, self)
+        self.clean_qgs_tab.file_cleaned.connect(self.on_file_cleaned)
+        return self.clean_qgs_tab
+    
     def setup_progress_section(self, layout):
         """Setup progress section."""
         progress_group = QGroupBox("Progress")
@@ -93,9 +167,11 @@ class KgrToolBoxDialog(QDockWidget):
         log_header_layout.addWidget(self.clear_logs_btn)
         progress_layout.addLayout(log_header_layout)
         
-        self.log_text = QTextEdit()
+        self.log_text = QPlainTextEdit()
         self.log_text.setMaximumHeight(100)
         self.log_text.setReadOnly(True)
+        # Drop the oldest lines instead of growing without bound
+        self.log_text.setMaximumBlockCount(5000)
         self.log_text.setPlaceholderText("Operation logs will appear here...")
         progress_layout.addWidget(self.log_text)
         
@@ -103,6 +179,8 @@ class KgrToolBoxDialog(QDockWidget):
     
     def clear_logs(self):
         """Clear the log text area."""
+        self._log_flush_timer.stop()
+        self._pending_log_messages.clear()
         self.log_text.clear()
     
     def connect_tab_signals(self):
@@ -116,29 +194,7 @@ class KgrToolBoxDialog(QDockWidget):
         # Databases tab signals
         self.databases_tab.databases_refreshed.connect(self.on_databases_refreshed)
         
-        # Truncate tab signals
-        self.truncate_tab.tables_truncated.connect(self.on_tables_truncated)
-        
-        # QGIS projects tab signals
-        self.qgis_projects_tab.projects_found.connect(self.on_projects_found)
-        
-        # Archive project tab signals
-        self.archive_project_tab.project_archived.connect(self.on_project_archived)
-        
-        # Clean QGS tab signals
-        self.clean_qgs_tab.file_cleaned.connect(self.on_file_cleaned)
-
-
-        # Connect all tab log signals to main log
-        # Connect all tab log signals to main log
-        tabs = [self.connection_tab, self.templates_tab, 
-                self.databases_tab, self.truncate_tab, self.qgis_projects_tab, 
-                self.archive_project_tab, self.clean_qgs_tab]
-        
-        for tab in tabs:
-            tab.log_message.connect(self.log_message)
-            tab.progress_started.connect(self.show_progress)
-            tab.progress_finished.connect(self.hide_progress)
+        # Signals of lazily built tabs are connected in their _build_* methods
     
     def on_connection_status_changed(self, success, message):
         """Handle connection status change."""
@@ -153,12 +209,16 @@ class KgrToolBoxDialog(QDockWidget):
     
     def on_databases_refreshed(self, databases):
         """Handle databases refresh."""
+        # Kept for tabs that have not been built yet
+        self._databases = databases
         # Update templates tab with source databases
         self.templates_tab.refresh_source_databases(databases)
         # Update QGIS projects tab with databases
-        self.qgis_projects_tab.refresh_qgis_databases(databases)
+        if self.qgis_projects_tab is not None:
+            self.qgis_projects_tab.refresh_qgis_databases(databases)
         # Update truncate tab with databases
-        self.truncate_tab.refresh_databases(databases)
+        if self.truncate_tab is not None:
+            self.truncate_tab.refresh_databases(databases)
     
     def on_tables_truncated(self, database_name, table_count):
         """Handle tables truncated."""
@@ -171,7 +231,6 @@ class KgrToolBoxDialog(QDockWidget):
     
     def on_file_cleaned(self, cleaned_file_path):
         """Handle file cleaned signal."""
-        import os
         filename = os.path.basename(cleaned_file_path)
         self.log_message(f"QGS file cleaned successfully: {filename}")
 
@@ -187,10 +246,20 @@ class KgrToolBoxDialog(QDockWidget):
     
     def log_message(self, message):
         """Add message to log."""
-        self.log_text.append(message)
-        # Auto-scroll to bottom
-        scrollbar = self.log_text.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        # Buffer messages and write them on the next timer tick so bursts of
+        # progress updates cost one append and one scroll instead of one each
+        self._pending_log_messages.append(message)
+        if not self._log_flush_timer.isActive():
+            self._log_flush_timer.start()
+    
+    def _flush_log(self):
+        """Write all buffered log messages to the log area."""
+        if not self._pending_log_messages:
+            return
+        
+        # QPlainTextEdit keeps the view at the bottom while it is scrolled there
+        self.log_text.appendPlainText("\n".join(self._pending_log_messages))
+        self._pending_log_messages.clear()
     
     def show_progress(self):
         """Show progress bar."""
@@ -201,7 +270,7 @@ class KgrToolBoxDialog(QDockWidget):
         """Hide progress bar."""
         self.progress_bar.setVisible(False)
     
-    def on_operation_finished(self, success, message):
+    def on_operation_finished(self, success, message, operation):
         """Handle operation finished signal from database manager."""
         self.hide_progress()
         # The individual tabs handle their specific operation results
@@ -212,6 +281,7 @@ class KgrToolBoxDialog(QDockWidget):
     
     def closeEvent(self, event):
         """Handle close event."""
-        # Save settings from connection tab
+        # Save settings from connection tab; a no-op unless they were edited
         self.connection_tab.save_settings()
+        self.db_manager.close_connections()
         event.accept()
\ No newline at end of file
@@ -98,6 +98,10 @@ class KgrToolbox:
         # Close dialog if open
         if self.dialog:
             self.dialog.close()
+        
+        # Release pooled server sessions even if the dialog never received a close event,
+        # including any a running task still holds, as the plugin code is going away
+        self.db_manager.close_connections(force=True)
 
     def run(self):
         """Run method that performs all the real work."""
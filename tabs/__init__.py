@@ -1,12 +1,36 @@
 """
 KGR Toolbox Tabs Module
 """
-from .connection_tab import ConnectionTab
-from .templates_tab import TemplatesTab
-from .databases_tab import DatabasesTab
-from .truncate_tab import TruncateTablesTab
-from .qgis_projects_tab import QGISProjectsTab
-from .archive_project_tab import ArchiveProjectTab
-from .clean_qgs_tab import CleanQGSTab
-
-__all__ = ['ConnectionTab', 'TemplatesTab', 'DatabasesTab', 'TruncateTablesTab', 'QGISProjectsTab', 'ArchiveProjectTab', 'CleanQGSTab']
\ No newline at end of file
+import importlib
+import sys
+
+# Tab classes are imported on first access (PEP 562) so that tabs which are never
+# opened, and their dependencies, are not loaded with the plugin
+_LAZY_IMPORTS = {
+    'LogBus': 'base_tab',
+    'ConnectionTab': 'connection_tab',
+    'TemplatesTab': 'templates_tab',
+    'DatabasesTab': 'databases_tab',
+    'TruncateTablesTab': 'truncate_tab',
+    'QGISProjectsTab': 'qgis_projects_tab',
+    'ArchiveProjectTab': 'archive_project_tab',
+    'CleanQGSTab': 'clean_qgs_tab',
+}
+
+__all__ = ['LogBus', 'ConnectionTab', 'TemplatesTab', 'DatabasesTab', 'TruncateTablesTab', 'QGISProjectsTab', 'ArchiveProjectTab', 'CleanQGSTab']
+
+
+def __getattr__(name):
+    """Import the module defining name on first access."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+# Module level __getattr__ needs Python 3.7; import everything up front on older versions
+if sys.version_info < (3, 7):
+    for _name in _LAZY_IMPORTS:
+        __getattr__(_name)
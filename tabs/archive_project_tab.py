@@ -3,24 +3,491 @@ Archive Project tab for PostgreSQL Template Manager.
 Custom portable QGIS project exporter (no libqfieldsync).
 """
 
+import hashlib
 import os
 import re
 import shutil
-import xml.etree.ElementTree as ET
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
 from pathlib import Path
+import PIL
+from osgeo import gdal
 from PIL import Image, ImageOps
-from qgis.PyQt.QtCore import pyqtSignal
+from qgis.PyQt.QtCore import Qt, pyqtSignal
 from qgis.PyQt.QtWidgets import (
     QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, QPushButton,
     QLabel, QFileDialog, QProgressBar, QMessageBox, QCheckBox, QSpinBox, QTextEdit
 )
 from qgis.PyQt.QtGui import QFont
-from qgis.core import QgsProject, QgsVectorLayer, QgsVectorFileWriter
+from qgis.core import QgsFields, QgsProject, QgsVectorLayer, QgsVectorFileWriter
 
 from .base_tab import BaseTab
 
+try:
+    from lxml import etree
+    # Lift libxml2's size limits, which projects embedding large SVG or image data exceed
+    XML_PARSER = etree.XMLParser(huge_tree=True)
+    ITERPARSE_OPTIONS = {'huge_tree': True}
+except ImportError:
+    import xml.etree.ElementTree as etree
+    XML_PARSER = None
+    ITERPARSE_OPTIONS = {}
+
+try:
+    import pyvips
+except (ImportError, OSError):
+    # pyvips is optional, and importing it fails with OSError when libvips is missing
+    pyvips = None
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; files are always copied there
+    fcntl = None
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.tiff', '.tif', '.bmp', '.webp')
+JPEG_EXTENSIONS = ('.jpg', '.jpeg')
+
+# EXIF tag holding the camera orientation (1 = upright)
+EXIF_ORIENTATION = 0x0112
+# Orientations whose rotation swaps width and height
+EXIF_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+# Windows absolute paths and file:/// URIs to them left in a project file
+WINDOWS_PATH_RE = re.compile(r'[A-Z]:[/\\][^"\s<>]*')
+FILE_URI_RE = re.compile(r'file:///[A-Z]:[/\\][^"\s<>]*')
+# Absolute CSV path (with optional query) of a LayerSource option value
+CSV_LAYER_SOURCE_RE = re.compile(r'file:///([A-Z]:[/\\][^"]*\.csv[^"]*)')
+# Lowercased literals marking URLs, XML namespaces and schemas rather than file paths
+NON_PATH_PREFIXES = ('http://', 'https://', 'ftp://', 'qgis.org')
+NON_PATH_SUFFIXES = ('.xsd', '.dtd')
+NON_PATH_MARKERS = ('xmlns', 'postgresql://', 'postgis:')
+# A user=/password= credential in a connection string, quoted or bare, and the whitespace
+# separating it from its neighbours; bare values stop at whitespace or the next XML tag.
+# Matched against the raw UTF-8 bytes of the project file.
+CREDENTIAL_PATTERN = r'''(?:user|password)=(?:['"][^'"]*['"]|[^\s'"<][^\s<]*)'''
+CREDENTIAL_RE = re.compile(rf'\s+{CREDENTIAL_PATTERN}|{CREDENTIAL_PATTERN}\s+|{CREDENTIAL_PATTERN}'.encode('ascii'))
+# Literal provider references left over after switching layers to GeoPackage
+POSTGRES_PROVIDER_REPLACEMENTS = {
+    'providerKey="postgres"': 'providerKey="ogr"',
+    "providerKey='postgres'": "providerKey='ogr'",
+    'provider="postgres"': 'provider="ogr"',
+    "provider='postgres'": "provider='ogr'",
+    '<Option name="LayerProviderName" type="QString" value="postgres" />':
+        '<Option name="LayerProviderName" type="QString" value="ogr" />',
+}
+# Concurrent PostgreSQL layer reads when exporting to GeoPackage; each opens its own connection
+EXPORT_WORKERS = 4
+# Characters of a layer name replaced to form its GeoPackage table name
+LAYER_NAME_TABLE = str.maketrans({' ': '_', '/': '_'})
+# Layer name inside the per-layer scratch GeoPackages
+SCRATCH_LAYER_NAME = "layer"
+# SQLite settings for writing archive GeoPackages, which are new files that are simply
+# written again if archiving is interrupted, so each commit need not wait for the disk
+GPKG_WRITE_CONFIG = {
+    'OGR_SQLITE_SYNCHRONOUS': 'OFF',
+    'OGR_SQLITE_JOURNAL': 'MEMORY',
+}
+# Minimum seconds between progress label updates while resizing images
+PROGRESS_UPDATE_INTERVAL = 1 / 30
+# Concurrent copies when archiving the project folder, both of top-level entries and of
+# the files inside copied folders
+COPY_WORKERS = 8
+# ioctl request cloning a whole file on copy-on-write filesystems (Btrfs, XFS, ...)
+FICLONE = 0x40049409
+# Seconds two modification times may differ by and still count as equal, which allows
+# for the 2 s resolution of FAT drives
+MTIME_TOLERANCE = 2
+# Smaller files are copied as they are rather than checked for duplicate content
+DEDUP_MIN_SIZE = 1 << 20
+# Pillow-SIMD is a drop-in Pillow build with SIMD resize kernels, versioned as X.Y.Z.postN
+PILLOW_SIMD = '.post' in PIL.__version__
+
+try:
+    from PIL import features
+    # libjpeg-turbo decodes and encodes JPEG about twice as fast as plain libjpeg
+    LIBJPEG_TURBO = bool(features.check_feature('libjpeg_turbo'))
+except (ImportError, ValueError):
+    LIBJPEG_TURBO = False
+
+
+def _iter_image_files(folder_path):
+    """Yield the paths of all images below folder_path."""
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_image_files(entry.path)
+            elif entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                yield entry.path
+
+
+def _resize_image(image_path, max_long_side):
+    """Resize one image in place if its long side exceeds max_long_side.
+    
+    Runs on worker threads, so it only touches the file and reports back
+    (image_path, original_size, new_size or None, error message or None).
+    A rewritten image keeps its modification time, which lets a later archive
+    recognise it as already resized (see _is_resized_copy).
+    """
+    try:
+        stat = os.stat(image_path)
+        is_jpeg = image_path.lower().endswith(JPEG_EXTENSIONS)
+        use_vips = pyvips is not None and is_jpeg
+        with Image.open(image_path) as img:
+            # Opening only reads the header; an upright image within the limit is left
+            # untouched rather than decoded and lossily re-encoded for nothing
+            orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+            if max(img.size) <= max_long_side and orientation == 1:
+                return image_path, img.size, None, None
+            
+            # Get original dimensions as displayed, i.e. after applying the EXIF rotation
+            width, height = img.size
+            if orientation in EXIF_TRANSPOSED_ORIENTATIONS:
+                width, height = height, width
+            long_side = max(width, height)
+            new_size = None
+            
+            # Only resize if long side exceeds the limit
+            if long_side > max_long_side:
+                # Calculate new dimensions maintaining aspect ratio
+                if width > height:
+                    new_size = (max_long_side, int(height * max_long_side / width))
+                else:
+                    new_size = (int(width * max_long_side / height), max_long_side)
+            
+            if not use_vips:
+                if new_size:
+                    # Let libjpeg scale down by 1/2, 1/4 or 1/8 while decoding, keeping at least
+                    # twice the target size so the Lanczos pass below still has detail to work with
+                    img.draft(img.mode, (img.width * 2 * max_long_side // long_side,
+                                         img.height * 2 * max_long_side // long_side))
+                
+                # Apply EXIF orientation to ensure correct rotation
+                img = ImageOps.exif_transpose(img)
+                
+                if new_size:
+                    # Box-reduce by a whole factor first (Pillow 7+) so Lanczos only filters an
+                    # image about twice the target size; formats without draft support gain most
+                    factor = max(img.size) // (2 * max_long_side)
+                    if factor > 1 and hasattr(img, 'reduce'):
+                        img = img.reduce(factor)
+                    img = img.resize(new_size, Image.LANCZOS)
+                
+                # Even if not resizing, save with correct orientation
+                if is_jpeg:
+                    img.save(image_path, 'JPEG', quality=95, optimize=True)
+                else:
+                    img.save(image_path, optimize=True)
+                os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+                
+                return image_path, (width, height), new_size, None
+        
+        # libvips decodes, rotates, shrinks and re-encodes the JPEG as one streamed pipeline
+        vips_size = _vips_resize_jpeg(image_path, max_long_side)
+        os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        return image_path, (width, height), vips_size if new_size else None, None
+    except Exception as e:
+        return image_path, None, None, str(e)
+
+
+def _vips_resize_jpeg(image_path, max_long_side):
+    """Shrink and upright a JPEG in place with libvips; returns the new size.
+    
+    The file is read into memory first, so the result can be written over it
+    without libvips still streaming from (or, on Windows, locking) the source.
+    """
+    with open(image_path, 'rb') as f:
+        data = f.read()
+    img = pyvips.Image.thumbnail_buffer(data, max_long_side, size='down')
+    output = img.write_to_buffer('.jpg', Q=95, optimize_coding=True)
+    with open(image_path, 'wb') as f:
+        f.write(output)
+    return img.width, img.height
+
+
+def _copy_then_resize(resize_executor, resize_futures, max_long_side, src, dst):
+    """copy_function queueing every copied image for resizing as soon as it is in place."""
+    if not str(dst).lower().endswith(IMAGE_EXTENSIONS):
+        return _copy_if_changed(src, dst)
+    if _is_resized_copy(src, dst, max_long_side):
+        return dst
+    
+    # An unchanged plain copy from an earlier archive made without resizing is kept,
+    # but still queued, as it may exceed the limit
+    _copy_if_changed(src, dst)
+    resize_futures.append(resize_executor.submit(_resize_image, str(dst), max_long_side))
+    return dst
+
+
+def _is_resized_copy(src, dst, max_long_side):
+    """True when dst is src as _resize_image left it: same modification time, upright and within the limit."""
+    try:
+        dst_stat = os.stat(dst)
+        if abs(os.stat(src).st_mtime - dst_stat.st_mtime) >= MTIME_TOLERANCE:
+            return False
+        # Only the header is read
+        with Image.open(dst) as img:
+            return max(img.size) <= max_long_side and img.getexif().get(EXIF_ORIENTATION, 1) == 1
+    except Exception:
+        return False
+
+
+@contextmanager
+def _gdal_thread_config(options):
+    """Apply GDAL configuration options to the current thread only, for the duration."""
+    previous = {key: gdal.GetThreadLocalConfigOption(key, None) for key in options}
+    for key, value in options.items():
+        gdal.SetThreadLocalConfigOption(key, value)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            gdal.SetThreadLocalConfigOption(key, value)
+
+
+def _export_layer(layer, gpkg_path, layer_name, overwrite_file=True):
+    """Write a vector layer to a GeoPackage table; returns (error, error message)."""
+    options = QgsVectorFileWriter.SaveVectorOptions()
+    options.driverName = "GPKG"
+    options.fileEncoding = "utf-8"
+    options.layerName = layer_name
+    
+    # Either create/overwrite the geopackage, or add the table to the existing one
+    if overwrite_file:
+        options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteFile
+    else:
+        options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteLayer
+    
+    # Thread-local, so the layers QGIS itself has open in GeoPackages keep their defaults
+    with _gdal_thread_config(GPKG_WRITE_CONFIG):
+        error, error_message = QgsVectorFileWriter.writeAsVectorFormat(layer, gpkg_path, options)
+    return error, error_message
+
+
+def _export_layer_source(source, provider_type, gpkg_path, layer_name, overwrite_file=True,
+                         crs=None, encoding=None):
+    """Export a layer opened afresh from its source, as _export_layer does.
+    
+    Used off the GUI thread, where the project's own layer objects must not be touched.
+    crs and encoding are those the layer has in the project, which may differ from
+    what the source itself declares (e.g. a shapefile without .prj).
+    """
+    options = QgsVectorLayer.LayerOptions()
+    if hasattr(options, 'skipCrsValidation'):
+        # The project's CRS is applied below, so nothing may prompt for one off the GUI thread
+        options.skipCrsValidation = True
+    layer = QgsVectorLayer(source, layer_name, provider_type, options)
+    if not layer.isValid():
+        return QgsVectorFileWriter.ErrCreateDataSource, "Could not open the layer's data source"
+    if crs is not None:
+        layer.setCrs(crs)
+    if encoding:
+        layer.setProviderEncoding(encoding)
+    return _export_layer(layer, gpkg_path, layer_name, overwrite_file)
+
+
+def _clone_file(src, dst):
+    """Make dst share src's data blocks on copy-on-write filesystems; True on success."""
+    if fcntl is None:
+        return False
+    try:
+        with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        shutil.copystat(src, dst)
+        return True
+    except OSError:
+        return False
+
+
+def _copy_file_range(src, dst):
+    """Copy src to dst with os.copy_file_range (Linux, Python 3.8+); True on success.
+    
+    Lets the kernel copy within a filesystem, or the server copy on NFS and SMB
+    shares, without the data passing through this process.
+    """
+    if not hasattr(os, 'copy_file_range'):
+        return False
+    try:
+        with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+            remaining = os.fstat(src_file.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src_file.fileno(), dst_file.fileno(), remaining)
+                if copied == 0:
+                    # Some filesystems report nothing copied instead of failing
+                    return False
+                remaining -= copied
+        shutil.copystat(src, dst)
+        return True
+    except OSError:
+        return False
+
+
+def _reflink_or_copy(src, dst):
+    """Copy src to dst, sharing the data blocks instead when the filesystem supports it.
+    
+    Falls back to an in-kernel copy_file_range and then to shutil.copy2 when cloning
+    is unsupported, e.g. across filesystems.
+    """
+    if _clone_file(src, dst) or _copy_file_range(src, dst):
+        return dst
+    return shutil.copy2(src, dst)
+
+
+def _is_unchanged(src, dst):
+    """True when dst looks like an earlier copy of src, having its size and modification time."""
+    try:
+        dst_stat = os.stat(dst)
+    except OSError:
+        return False
+    src_stat = os.stat(src)
+    # Copies keep the modification time
+    return src_stat.st_size == dst_stat.st_size and abs(src_stat.st_mtime - dst_stat.st_mtime) < MTIME_TOLERANCE
+
+
+def _copy_if_changed(src, dst):
+    """Copy src to dst with _reflink_or_copy, unless dst is an unchanged earlier copy."""
+    if _is_unchanged(src, dst):
+        return dst
+    return _reflink_or_copy(src, dst)
+
+
+def _remove_path(path):
+    """Remove a file or a whole folder."""
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+
+def _file_digest(path):
+    """Return a BLAKE2 digest of the file's content."""
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        for chunk in iter(partial(f.read, 1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class _DedupCopier:
+    """copy_function cloning files whose content was already copied during the run.
+    
+    Duplicates are only ever cloned, never hard-linked, so editing or resizing one
+    copy in the archive leaves the other untouched. Files are hashed only once a
+    second file of the same size turns up, and hashing stops for the rest of the
+    run as soon as the target filesystem turns out not to support cloning.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._copied_by_size = {}
+        self._digests = {}
+        self._enabled = fcntl is not None
+    
+    def __call__(self, src, dst):
+        size = os.path.getsize(src)
+        if not self._enabled or size < DEDUP_MIN_SIZE or _is_unchanged(src, dst):
+            return _copy_if_changed(src, dst)
+        
+        with self._lock:
+            same_size = list(self._copied_by_size.get(size, ()))
+        if same_size:
+            digest = _file_digest(src)
+            for copied in same_size:
+                if self._digest(copied) == digest:
+                    if _clone_file(copied, dst):
+                        return dst
+                    self._enabled = False
+                    break
+        
+        _reflink_or_copy(src, dst)
+        with self._lock:
+            self._copied_by_size.setdefault(size, []).append(dst)
+        return dst
+    
+    def _digest(self, path):
+        """Return the cached digest of an already copied file."""
+        digest = self._digests.get(path)
+        if digest is None:
+            digest = self._digests[path] = _file_digest(path)
+        return digest
+
+
+def _copytree_parallel(src, dst, copy_function, file_executor):
+    """Copy the folder src to dst like shutil.copytree, copying its files on file_executor.
+    
+    An existing dst is updated to match src: entries no longer in src are removed,
+    and copy_function may skip files that are unchanged since an earlier archive.
+    Folders get their metadata once all files are in place, so that writing the
+    files does not change the copied folder times again.
+    """
+    folders = []
+    futures = []
+    pending = [(src, dst)]
+    while pending:
+        src_folder, dst_folder = pending.pop()
+        os.makedirs(dst_folder, exist_ok=True)
+        folders.append((src_folder, dst_folder))
+        with os.scandir(src_folder) as entries:
+            entries = list(entries)
+        
+        names = {entry.name for entry in entries}
+        for name in os.listdir(dst_folder):
+            if name not in names:
+                _remove_path(os.path.join(dst_folder, name))
+        
+        for entry in entries:
+            target = os.path.join(dst_folder, entry.name)
+            if entry.is_dir():
+                if os.path.islink(target) or os.path.isfile(target):
+                    os.remove(target)
+                pending.append((entry.path, target))
+            else:
+                if os.path.isdir(target):
+                    _remove_path(target)
+                futures.append(file_executor.submit(copy_function, entry.path, target))
+    
+    for future in futures:
+        future.result()
+    for src_folder, dst_folder in folders:
+        shutil.copystat(src_folder, dst_folder)
+
+
+def _copy_project_item(item, target_path, copy_function, file_executor):
+    """Copy one top-level project file or folder, updating an existing copy in place.
+    
+    Returns target_path, or None for entries that are neither files nor folders.
+    """
+    if item.is_file():
+        if target_path.is_dir():
+            _remove_path(target_path)
+        copy_function(item, target_path)
+    elif item.is_dir():
+        if target_path.is_symlink() or target_path.is_file():
+            os.remove(target_path)
+        _copytree_parallel(item, target_path, copy_function, file_executor)
+    else:
+        return None
+    return target_path
+
+
+def _replace_all(value, replacements):
+    """Apply every old -> new substring replacement to value."""
+    for old, new in replacements.items():
+        value = value.replace(old, new)
+    return value
+
+
 class ArchiveProjectTab(BaseTab):
     project_archived = pyqtSignal(str)
+    # Progress of the archive worker thread, shown by the GUI thread
+    archive_status = pyqtSignal(str)
+    archive_step = pyqtSignal(int)
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -233,6 +700,8 @@ class ArchiveProjectTab(BaseTab):
     def connect_signals(self):
         self.browse_folder_btn.clicked.connect(self._browse_output_folder)
         self.archive_btn.clicked.connect(self._on_archive_project)
+        self.archive_status.connect(self.progress_label.setText, Qt.QueuedConnection)
+        self.archive_step.connect(self.progress_bar.setValue, Qt.QueuedConnection)
 
     def _browse_output_folder(self):
         folder = QFileDialog.getExistingDirectory(
@@ -242,11 +711,10 @@ class ArchiveProjectTab(BaseTab):
             self.output_folder_edit.setText(folder)
             self.emit_log(f"Output folder set to: {folder}")
 
-    def _create_archive_report(self, output_folder, project_file, resized_images_count=0):
+    def _create_archive_report(self, output_folder, project_file, resized_images_count=0, max_pixels=None,
+                               user_notes=""):
         """Create an archive report file with details about the archiving process"""
         try:
-            from datetime import datetime
-            
             report_path = Path(output_folder) / "archive_report.txt"
             
             # Get current date and time
@@ -256,9 +724,6 @@ class ArchiveProjectTab(BaseTab):
             project_name = os.path.splitext(os.path.basename(project_file))[0]
             project_path = str(project_file)
             
-            # Get user notes
-            user_notes = self.notes_textedit.toPlainText().strip()
-            
             # Create report content
             report_lines = [
                 "QGIS PORTABLE PROJECT ARCHIVE REPORT",
@@ -278,8 +743,7 @@ class ArchiveProjectTab(BaseTab):
             ]
             
             # Add image resizing info if applicable
-            if self.resize_images_checkbox.isChecked():
-                max_pixels = self.pixel_spinbox.value()
+            if max_pixels:
                 report_lines.extend([
                     f"- Images resized to maximum {max_pixels}px on long side",
                     f"- Total images processed: {resized_images_count}"
@@ -291,111 +755,102 @@ class ArchiveProjectTab(BaseTab):
                     "",
                     "USER NOTES:",
                     "-" * 12,
-                    user_notes
                 ])
             
-            # Write report file
+            # Write report file; the notes can be long, so they are written as they are
+            # instead of being copied once more into the joined report text
             with open(report_path, 'w', encoding='utf-8') as f:
                 f.write("\n".join(report_lines))
+                if user_notes:
+                    f.write("\n")
+                    f.write(user_notes)
             
             self.emit_log(f"Archive report created: {report_path}")
             
         except Exception as e:
             self.emit_log(f"Could not create archive report: {str(e)}")
 
+    def _log_resizing_started(self, max_long_side):
+        self.emit_log(f"Resizing images in DCIM folders to {max_long_side}px long side...")
+        if pyvips is not None:
+            self.emit_log("Image backend: pyvips")
+        else:
+            backend = "Pillow-SIMD" if PILLOW_SIMD else "Pillow"
+            jpeg_library = "libjpeg-turbo" if LIBJPEG_TURBO else "libjpeg"
+            self.emit_log(f"Image backend: {backend} with {jpeg_library}")
+        if pyvips is None and not PILLOW_SIMD:
+            self.emit_log("Tip: installing pyvips, or pillow-simd in place of Pillow, makes image resizing several times faster")
+
     def _resize_images_in_folder(self, folder_path, max_long_side):
         """Resize all images in a folder if their long side exceeds max_long_side"""
-        supported_formats = ('.jpg', '.jpeg', '.png', '.tiff', '.tif', '.bmp', '.webp')
-        resized_count = 0
-        
         try:
-            image_files = []
-            for root, dirs, files in os.walk(folder_path):
-                for file in files:
-                    if file.lower().endswith(supported_formats):
-                        image_files.append(os.path.join(root, file))
+            image_files = list(_iter_image_files(folder_path))
             
             if not image_files:
                 return 0
                 
             self.emit_log(f"Found {len(image_files)} images to potentially resize in {folder_path}")
             
-            for i, image_path in enumerate(image_files):
-                try:
-                    # Update progress
-                    self.progress_label.setText(f"Resizing image {i+1}/{len(image_files)}: {os.path.basename(image_path)}")
-                    
-                    with Image.open(image_path) as img:
-                        # Apply EXIF orientation to ensure correct rotation
-                        img = ImageOps.exif_transpose(img)
-                        
-                        # Get original dimensions
-                        width, height = img.size
-                        long_side = max(width, height)
-                        
-                        # Only resize if long side exceeds the limit
-                        if long_side > max_long_side:
-                            # Calculate new dimensions maintaining aspect ratio
-                            if width > height:
-                                new_width = max_long_side
-                                new_height = int(height * max_long_side / width)
-                            else:
-                                new_height = max_long_side
-                                new_width = int(width * max_long_side / height)
-                            
-                            # Resize the image
-                            resized_img = img.resize((new_width, new_height), Image.LANCZOS)
-                            
-                            # Save with appropriate quality settings
-                            if image_path.lower().endswith(('.jpg', '.jpeg')):
-                                resized_img.save(image_path, 'JPEG', quality=95, optimize=True)
-                            else:
-                                resized_img.save(image_path, optimize=True)
-                            
-                            resized_count += 1
-                            self.emit_log(f"Resized {os.path.basename(image_path)} from {width}x{height} to {new_width}x{new_height}")
-                        else:
-                            # Even if not resizing, save with correct orientation if it's a JPEG
-                            if image_path.lower().endswith(('.jpg', '.jpeg')):
-                                img.save(image_path, 'JPEG', quality=95, optimize=True)
-                            else:
-                                img.save(image_path, optimize=True)
-                
-                except Exception as e:
-                    self.emit_log(f"Could not resize {os.path.basename(image_path)}: {str(e)}")
-                    continue
-            
-            return resized_count
+            # Pillow releases the GIL while decoding, resizing and encoding, so threads
+            # scale across cores; results are handled here in the original order
+            resize = partial(_resize_image, max_long_side=max_long_side)
+            with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+                return self._collect_resize_results(executor.map(resize, image_files), len(image_files))
             
         except Exception as e:
             self.emit_log(f"Error during image resizing: {str(e)}")
             return 0
 
+    def _collect_resize_results(self, results, total):
+        """Report the results of _resize_image calls as they come in; returns the resized count."""
+        resized_count = 0
+        last_update = 0.0
+        for i, (image_path, original_size, new_size, error) in enumerate(results):
+            name = os.path.basename(image_path)
+            
+            # Update progress, throttled so thousands of small images don't flood the label
+            now = time.monotonic()
+            if now - last_update >= PROGRESS_UPDATE_INTERVAL or i + 1 == total:
+                last_update = now
+                self.archive_status.emit(f"Resizing image {i+1}/{total}: {name}")
+            
+            if error is not None:
+                self.emit_log(f"Could not resize {name}: {error}")
+            elif new_size is not None:
+                resized_count += 1
+                self.emit_log(f"Resized {name} from "
+                              f"{original_size[0]}x{original_size[1]} to {new_size[0]}x{new_size[1]}")
+        
+        return resized_count
+
     def _detect_remaining_absolute_paths(self, qgs_path):
         """Detect and report remaining absolute paths in the project file"""
         try:
-            with open(str(qgs_path), 'r', encoding='utf-8') as f:
-                content = f.read()
-            
             found_paths = {}
             
-            # Look for Windows absolute paths
-            windows_pattern = r'[A-Z]:[/\\][^"\s<>]*'
-            for match in re.findall(windows_pattern, content):
-                if self._is_likely_absolute_path(match):
-                    path_type = self._categorize_path_simple(match)
-                    if path_type not in found_paths:
-                        found_paths[path_type] = set()
-                    found_paths[path_type].add(match)
-            
-            # Look specifically for file:/// URIs
-            file_uri_pattern = r'file:///[A-Z]:[/\\][^"\s<>]*'
-            for match in re.findall(file_uri_pattern, content):
-                if self._is_likely_absolute_path(match):
-                    path_type = self._categorize_path_simple(match)
-                    if path_type not in found_paths:
-                        found_paths[path_type] = set()
-                    found_paths[path_type].add(match)
+            # Walk the document once, looking only at attribute values and element text
+            # instead of running the patterns over the whole serialized file. QGIS keeps
+            # paths only there, so comments, processing instructions and the text between
+            # elements (whose tail is not yet parsed when an element ends) are not scanned
+            for _, elem in etree.iterparse(str(qgs_path), events=('end',), **ITERPARSE_OPTIONS):
+                values = list(elem.attrib.values())
+                if elem.text:
+                    values.append(elem.text)
+                
+                for value in values:
+                    # Every candidate needs a drive letter followed by a colon
+                    if ':' not in value:
+                        continue
+                    # Windows absolute paths and file:/// URIs pointing at them
+                    for match in WINDOWS_PATH_RE.findall(value) + FILE_URI_RE.findall(value):
+                        if self._is_likely_absolute_path(match):
+                            path_type = self._categorize_path_simple(match)
+                            if path_type not in found_paths:
+                                found_paths[path_type] = set()
+                            found_paths[path_type].add(match)
+                
+                # Children have been visited by the time their parent ends
+                elem.clear()
             
             return found_paths
             
@@ -406,20 +861,11 @@ class ArchiveProjectTab(BaseTab):
     def _is_likely_absolute_path(self, path):
         """Check if a string is likely to be an absolute file path"""
         # Skip URLs, XML namespaces, and other non-path strings
-        skip_patterns = [
-            r'^https?://',
-            r'^ftp://',
-            r'xmlns',
-            r'\.xsd$',
-            r'\.dtd$',
-            r'^qgis\.org',
-            r'postgresql://',
-            r'postgis:',
-        ]
-        
-        for pattern in skip_patterns:
-            if re.search(pattern, path, re.IGNORECASE):
-                return False
+        lowered = path.lower()
+        if (lowered.startswith(NON_PATH_PREFIXES)
+                or lowered.endswith(NON_PATH_SUFFIXES)
+                or any(marker in lowered for marker in NON_PATH_MARKERS)):
+            return False
         
         # Check if it looks like a file path
         return (
@@ -503,56 +949,61 @@ class ArchiveProjectTab(BaseTab):
     def _try_convert_csv_paths_to_relative(self, qgs_path, output_folder):
         """Attempt to convert CSV file paths to relative paths if the files exist in the project"""
         try:
-            with open(str(qgs_path), 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Use targeted pattern for CSV LayerSource entries
-            csv_pattern = r'<Option name="LayerSource"[^>]*value="file:///([A-Z]:[/\\][^"]*\.csv[^"]*)"'
-            csv_matches = re.findall(csv_pattern, content)
-            
-            if not csv_matches:
-                return 0
-            
-            updated_content = content
-            conversions_made = 0
-            
-            for csv_path in csv_matches:
-                try:
-                    # Extract just the filename
-                    csv_filename = os.path.basename(csv_path.split('?')[0])  # Remove query parameters
-                    
-                    # Check if this CSV file exists in the output folder
-                    potential_csv_path = Path(output_folder) / csv_filename
-                    if potential_csv_path.exists():
-                        # Create relative path
-                        relative_path = f"./{csv_filename}"
-                        query_part = ""
-                        if '?' in csv_path:
-                            query_part = "?" + csv_path.split('?', 1)[1]
-                        
-                        new_source = f"file:///{relative_path}{query_part}"
-                        old_source = f"file:///{csv_path}"
-                        
-                        # Replace in content
-                        updated_content = updated_content.replace(old_source, new_source)
-                        conversions_made += 1
-                        self.emit_log(f"Converted CSV path to relative: {csv_filename}")
-                except Exception as e:
-                    self.emit_log(f"Error processing CSV path {csv_path}: {str(e)}")
-                    continue
-            
-            if conversions_made > 0:
-                # Write updated content back
-                with open(str(qgs_path), 'w', encoding='utf-8') as f:
-                    f.write(updated_content)
-                self.emit_log(f"Successfully converted {conversions_made} CSV path(s) to relative")
-            
+            tree = etree.parse(str(qgs_path), XML_PARSER)
+            conversions_made = self._convert_csv_paths_in_tree(tree.getroot(), output_folder)
+            if conversions_made:
+                tree.write(str(qgs_path), encoding='UTF-8', xml_declaration=True)
             return conversions_made
             
         except Exception as e:
             self.emit_log(f"Error converting CSV paths: {str(e)}")
             return 0
 
+    def _convert_csv_paths_in_tree(self, root, output_folder):
+        """Point CSV layer sources found in output_folder at their relative path; returns the count"""
+        # Collect the CSV LayerSource entries that can be made relative
+        replacements = {}
+        for option in root.iter('Option'):
+            if option.get('name') != 'LayerSource':
+                continue
+            match = CSV_LAYER_SOURCE_RE.match(option.get('value', ''))
+            if not match:
+                continue
+            
+            csv_path = match.group(1)
+            try:
+                # Extract just the filename
+                csv_filename = os.path.basename(csv_path.split('?')[0])  # Remove query parameters
+                
+                # Check if this CSV file exists in the output folder
+                potential_csv_path = Path(output_folder) / csv_filename
+                if potential_csv_path.exists():
+                    # Create relative path
+                    relative_path = f"./{csv_filename}"
+                    query_part = ""
+                    if '?' in csv_path:
+                        query_part = "?" + csv_path.split('?', 1)[1]
+                    
+                    replacements[f"file:///{csv_path}"] = f"file:///{relative_path}{query_part}"
+                    self.emit_log(f"Converted CSV path to relative: {csv_filename}")
+            except Exception as e:
+                self.emit_log(f"Error processing CSV path {csv_path}: {str(e)}")
+                continue
+        
+        if not replacements:
+            return 0
+        
+        # Apply the replacements wherever the old sources occur, in one walk of the tree
+        for elem in root.iter():
+            for name, value in elem.attrib.items():
+                if 'file:///' in value:
+                    elem.set(name, _replace_all(value, replacements))
+            if elem.text and 'file:///' in elem.text:
+                elem.text = _replace_all(elem.text, replacements)
+        
+        self.emit_log(f"Successfully converted {len(replacements)} CSV path(s) to relative")
+        return len(replacements)
+
     def _on_archive_project(self):
         output_folder = self.output_folder_edit.text().strip()
         if not self.validate_non_empty_field(output_folder, "output folder"):
@@ -597,64 +1048,162 @@ class ArchiveProjectTab(BaseTab):
         if not self.confirm_action("Copy All Project Files", warning_msg):
             return
 
+        # Everything the archive needs from the GUI and the project is read here; the work
+        # itself runs on a worker thread so that QGIS stays responsive while it progresses
+        vector_layers = [layer for layer in project.mapLayers().values()
+                         if layer.type() == QgsVectorLayer.VectorLayer]
+        total_files = len([item for item in project_file.parent.iterdir() if item.name != project_file.name])
+        total_steps = total_files + len(vector_layers) + 5  # +5 for project copy, final update, CSV conversion, path detection, and report creation
+
         # Start progress
-        self.emit_progress_started()
+        self.begin_operation(self.archive_btn)
         self.progress_label.setVisible(True)
         self.progress_bar.setVisible(True)
-        self.progress_bar.setRange(0, 0)  # Indeterminate progress
-        self.archive_btn.setEnabled(False)
+        self.progress_bar.setRange(0, total_steps)
+        self.progress_bar.setValue(0)
+        
+        scratch_folder = None
+        try:
+            scratch_folder = tempfile.mkdtemp(dir=output_folder)
+            job = {
+                'output_folder': output_folder,
+                'project_file': project_file,
+                'max_pixels': self.pixel_spinbox.value() if self.resize_images_checkbox.isChecked() else None,
+                'user_notes': self.notes_textedit.toPlainText().strip(),
+                'scratch_folder': scratch_folder,
+                'layers': [self._snapshot_layer(layer, i, scratch_folder) for i, layer in enumerate(vector_layers)],
+                'total_files': total_files,
+                'total_steps': total_steps,
+            }
+        except Exception as e:
+            self.emit_log(f"Error creating archive: {str(e)}")
+            if scratch_folder is not None:
+                shutil.rmtree(scratch_folder, ignore_errors=True)
+            self._on_archive_finished(None)
+            return
+        
+        self.db_manager.run_in_background(self._archive_project, job, callback=self._on_archive_finished)
 
+    def _snapshot_layer(self, layer, index, scratch_folder):
+        """Describe a vector layer for the archive worker, which must not touch project layers.
+        
+        Layers that cannot be opened again from their source as they are in the project
+        are exported to a scratch GeoPackage right away instead: memory and virtual
+        layers (which may query other project layers), layers with unsaved edits, and
+        layers with expression or joined fields, which only exist on the layer object.
+        """
+        source = layer.source()
+        snapshot = {
+            'id': layer.id(),
+            'name': layer.name(),
+            'provider': layer.providerType(),
+            'source': source,
+            'is_postgres': layer.providerType() == "postgres" or "postgresql" in source.lower(),
+            # Set in the project rather than read from the source, so kept for reopening it
+            'crs': layer.crs(),
+            'encoding': layer.dataProvider().encoding() if layer.dataProvider() else None,
+            'error': None,
+        }
+        fields = layer.fields()
+        has_layer_only_fields = any(
+            fields.fieldOrigin(i) in (QgsFields.OriginExpression, QgsFields.OriginJoin)
+            for i in range(fields.count())
+        )
+        if layer.providerType() in ("memory", "virtual") or layer.isEditable() or has_layer_only_fields:
+            scratch_path = os.path.join(scratch_folder, f"{index}.gpkg")
+            error, error_message = _export_layer(layer, scratch_path, SCRATCH_LAYER_NAME)
+            if error == QgsVectorFileWriter.NoError:
+                # The scratch GeoPackage carries the CRS itself and is always UTF-8
+                snapshot.update(provider="ogr", source=f"{scratch_path}|layername={SCRATCH_LAYER_NAME}",
+                                crs=None, encoding=None)
+            else:
+                snapshot['error'] = error_message
+        return snapshot
+
+    def _report_step(self, step):
+        """Move the progress bar to step, but only when its whole percentage changes."""
+        # Each emit is a queued call and a repaint on the GUI thread, which adds up
+        # for projects with hundreds of files or layers
+        percent = step * 100 // self._total_steps
+        if percent != self._last_step_percent:
+            self._last_step_percent = percent
+            self.archive_step.emit(step)
+
+    def _archive_project(self, job):
+        """Archive the project described by job; runs on a worker thread.
+        
+        Reports only through signals and returns a summary for _on_archive_finished,
+        or None when archiving failed.
+        """
+        output_folder = job['output_folder']
+        project_file = job['project_file']
+        max_pixels = job['max_pixels']
+        total_files = job['total_files']
+        self._total_steps = job['total_steps']
+        self._last_step_percent = -1
+        
         project_name = os.path.splitext(os.path.basename(project_file))[0]
         export_qgs_filename = f"{project_name}_portable.qgs"
         export_path = Path(output_folder) / export_qgs_filename
         gpkg_path = Path(output_folder) / "data.gpkg"
 
         try:
-            # Count total steps for progress calculation
-            total_layers = len([layer for layer in project.mapLayers().values() 
-                              if layer.type() == QgsVectorLayer.VectorLayer])
-            project_dir = project_file.parent
-            total_files = len([item for item in project_dir.iterdir() if item.name != project_file.name])
-            
-            total_steps = total_files + total_layers + 5  # +5 for project copy, final update, CSV conversion, path detection, and report creation
             current_step = 0
-            
-            # Switch to determinate progress
-            self.progress_bar.setRange(0, total_steps)
-            self.progress_label.setText("Copying project files...")
+            project_dir = project_file.parent
+            self.archive_status.emit("Copying project files...")
 
             # 1. Copy all files and folders from project directory to output folder (except the QGS file)
             original_qgs_name = project_file.name
             dcim_folders = []  # Track DCIM folders for potential resizing
+            resize_images = max_pixels is not None
+            total_resized = 0
             
             # Only copy if source and target directories are different
             if str(project_dir) != str(Path(output_folder)):
                 self.emit_log(f"Copying files from project directory: {project_dir}")
                 
-                for item in project_dir.iterdir():
-                    if item.name == original_qgs_name:
-                        # Skip the original QGS file as we'll create the portable version
-                        continue
-                    
-                    target_path = Path(output_folder) / item.name
+                # Skip the original QGS file as we'll create the portable version
+                items = [item for item in project_dir.iterdir() if item.name != original_qgs_name]
+                
+                # Top-level entries are independent, so copy them concurrently to overlap I/O, and
+                # fan the files of each folder out to their own pool so one large DCIM folder does
+                # not copy serially; the shared copier clones content already copied elsewhere
+                copier = _DedupCopier()
+                resize_futures = []
+                with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as resize_executor, \
+                        ThreadPoolExecutor(max_workers=COPY_WORKERS) as file_executor, \
+                        ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+                    futures = {}
+                    for item in items:
+                        copy_function = copier
+                        if resize_images and item.is_dir() and item.name.upper() == "DCIM":
+                            # Resize each DCIM image as soon as it has been copied, overlapping the
+                            # copy I/O with the resizing; these bypass the copier so that nothing
+                            # is ever cloned from an image while it is being rewritten
+                            copy_function = partial(_copy_then_resize, resize_executor, resize_futures, max_pixels)
+                        target_path = Path(output_folder) / item.name
+                        futures[executor.submit(_copy_project_item, item, target_path, copy_function, file_executor)] = item
                     
-                    if item.is_file():
-                        self.progress_label.setText(f"Copying file: {item.name}")
-                        shutil.copy2(item, target_path)
-                        self.emit_log(f"Copied file: {item.name}")
-                    elif item.is_dir():
-                        self.progress_label.setText(f"Copying folder: {item.name}")
-                        if target_path.exists():
-                            shutil.rmtree(target_path)
-                        shutil.copytree(item, target_path)
-                        self.emit_log(f"Copied folder: {item.name}")
+                    for future in as_completed(futures):
+                        item = futures[future]
+                        target_path = future.result()
+                        
+                        if target_path is not None:
+                            kind = "folder" if item.is_dir() else "file"
+                            self.archive_status.emit(f"Copied {kind}: {item.name}")
+                            self.emit_log(f"Copied {kind}: {item.name}")
                         
-                        # Track DCIM folders for potential resizing
-                        if item.name.upper() == "DCIM":
-                            dcim_folders.append(target_path)
+                        current_step += 1
+                        self._report_step(current_step)
                     
-                    current_step += 1
-                    self.progress_bar.setValue(current_step)
+                    # Every copy has finished, so all DCIM images have been queued by now
+                    if resize_futures:
+                        self._log_resizing_started(max_pixels)
+                        self.emit_log(f"Found {len(resize_futures)} images to potentially resize in DCIM folders")
+                        total_resized = self._collect_resize_results(
+                            (resize_future.result() for resize_future in resize_futures), len(resize_futures)
+                        )
+                        self.emit_log(f"Total images resized: {total_resized}")
             else:
                 self.emit_log("Source and target directories are the same, skipping file copy")
                 # Still need to find DCIM folders in the current directory
@@ -662,16 +1211,14 @@ class ArchiveProjectTab(BaseTab):
                     if item.is_dir() and item.name.upper() == "DCIM":
                         dcim_folders.append(item)
                 current_step += total_files  # Skip file copy steps
-                self.progress_bar.setValue(current_step)
+                self._report_step(current_step)
 
-            # 2. Resize images in DCIM folders if requested
-            total_resized = 0
-            if self.resize_images_checkbox.isChecked() and dcim_folders:
-                max_pixels = self.pixel_spinbox.value()
-                self.emit_log(f"Resizing images in DCIM folders to {max_pixels}px long side...")
+            # 2. Resize images in DCIM folders that were not copied (and so not resized yet)
+            if resize_images and dcim_folders:
+                self._log_resizing_started(max_pixels)
                 
                 for dcim_folder in dcim_folders:
-                    self.progress_label.setText(f"Processing images in {dcim_folder.name}...")
+                    self.archive_status.emit(f"Processing images in {dcim_folder.name}...")
                     resized_count = self._resize_images_in_folder(str(dcim_folder), max_pixels)
                     total_resized += resized_count
                     self.emit_log(f"Resized {resized_count} images in {dcim_folder}")
@@ -679,154 +1226,158 @@ class ArchiveProjectTab(BaseTab):
                 self.emit_log(f"Total images resized: {total_resized}")
 
             # 3. Copy the current project file to output folder
-            self.progress_label.setText("Copying project file...")
-            shutil.copy2(str(project_file), str(export_path))
+            self.archive_status.emit("Copying project file...")
+            _reflink_or_copy(str(project_file), str(export_path))
             self.emit_log(f"Copied project file to: {export_path}")
             current_step += 1
-            self.progress_bar.setValue(current_step)
+            self._report_step(current_step)
 
             # 4. Convert all layers to a single geopackage
-            self.progress_label.setText("Converting layers to geopackage...")
+            self.archive_status.emit("Converting layers to geopackage...")
             new_layer_sources = {}
             postgresql_layers = []
             first_layer = True
             
-            for layer_id, layer in project.mapLayers().items():
-                if layer.type() == QgsVectorLayer.VectorLayer:
+            # Fetching PostgreSQL layers is network-bound, so they are read concurrently, each
+            # into a scratch GeoPackage of its own (GeoPackage allows only one writer); the
+            # combined data.gpkg is then still written from here, one layer at a time
+            with ThreadPoolExecutor(max_workers=EXPORT_WORKERS) as export_executor:
+                prefetched = {}
+                for i, layer in enumerate(job['layers']):
+                    if layer['provider'] == "postgres" and layer['error'] is None:
+                        scratch_path = os.path.join(job['scratch_folder'], f"{i}.gpkg")
+                        prefetched[layer['id']] = (scratch_path, export_executor.submit(
+                            _export_layer_source, layer['source'], layer['provider'], scratch_path, SCRATCH_LAYER_NAME,
+                            crs=layer['crs'], encoding=layer['encoding']
+                        ))
+                
+                for layer in job['layers']:
                     # Check if it's a PostgreSQL layer
-                    provider_type = layer.providerType()
-                    source = layer.source()
-                    
-                    if provider_type == "postgres" or "postgresql" in source.lower():
-                        postgresql_layers.append(layer)
-                        self.emit_log(f"Found PostgreSQL layer: {layer.name()}")
+                    if layer['is_postgres']:
+                        postgresql_layers.append(layer['name'])
+                        self.emit_log(f"Found PostgreSQL layer: {layer['name']}")
                     
                     # Export layer to geopackage
-                    layer_name = layer.name().replace(' ', '_').replace('/', '_')
-                    self.progress_label.setText(f"Converting layer: {layer.name()}")
-                    
-                    # Create write options
-                    options = QgsVectorFileWriter.SaveVectorOptions()
-                    options.driverName = "GPKG"
-                    options.fileEncoding = "utf-8"
-                    options.layerName = layer_name
+                    layer_name = layer['name'].translate(LAYER_NAME_TABLE)
+                    self.archive_status.emit(f"Converting layer: {layer['name']}")
                     
-                    # For the first layer, create/overwrite the geopackage
-                    # For subsequent layers, append to existing geopackage
-                    if first_layer:
-                        options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteFile
-                        first_layer = False
-                    else:
-                        options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteLayer
+                    source, provider_type = layer['source'], layer['provider']
+                    crs, encoding = layer['crs'], layer['encoding']
+                    error, error_message = QgsVectorFileWriter.NoError, layer['error']
+                    if error_message is not None:
+                        error = QgsVectorFileWriter.ErrCreateDataSource
+                    elif layer['id'] in prefetched:
+                        scratch_path, future = prefetched[layer['id']]
+                        error, error_message = future.result()
+                        source, provider_type = f"{scratch_path}|layername={SCRATCH_LAYER_NAME}", "ogr"
+                        crs, encoding = None, None
                     
-                    # Export layer
-                    error, error_message = QgsVectorFileWriter.writeAsVectorFormat(
-                        layer, 
-                        str(gpkg_path),
-                        options
-                    )
+                    if error == QgsVectorFileWriter.NoError:
+                        # The first layer creates/overwrites the geopackage, later ones are added to it
+                        error, error_message = _export_layer_source(
+                            source, provider_type, str(gpkg_path), layer_name, overwrite_file=first_layer,
+                            crs=crs, encoding=encoding
+                        )
                     
                     if error == QgsVectorFileWriter.NoError:
+                        first_layer = False
                         # Use relative path since GeoPackage is always next to QGS file
                         new_source = f"data.gpkg|layername={layer_name}"
-                        new_layer_sources[layer_id] = new_source
-                        self.emit_log(f"Exported {layer.name()} to geopackage")
+                        new_layer_sources[layer['id']] = new_source
+                        self.emit_log(f"Exported {layer['name']} to geopackage")
                     else:
-                        self.emit_log(f"Failed to export {layer.name()}: {error_message}")
+                        self.emit_log(f"Failed to export {layer['name']}: {error_message}")
                     
                     current_step += 1
-                    self.progress_bar.setValue(current_step)
+                    self._report_step(current_step)
 
             # 5. Update the copied project file to point to geopackage and clean credentials
-            self.progress_label.setText("Updating project file...")
+            self.archive_status.emit("Updating project file...")
+            csv_conversions = None
             if new_layer_sources:
-                self._update_project_sources_comprehensive(export_path, new_layer_sources, postgresql_layers, str(gpkg_path))
+                # CSV paths are converted in the same pass, so the file is only parsed and written once
+                csv_conversions = self._update_project_sources_comprehensive(
+                    export_path, new_layer_sources, postgresql_layers, str(gpkg_path), output_folder
+                )
                 self.emit_log("Updated project file to use geopackage sources and removed credentials")
             
             current_step += 1
-            self.progress_bar.setValue(current_step)
+            self._report_step(current_step)
 
-            # 6. Try to convert CSV paths to relative if possible
-            self.progress_label.setText("Converting CSV paths to relative...")
-            csv_conversions = self._try_convert_csv_paths_to_relative(export_path, output_folder)
+            # 6. Try to convert CSV paths to relative if possible (unless done above)
+            self.archive_status.emit("Converting CSV paths to relative...")
+            if csv_conversions is None:
+                csv_conversions = self._try_convert_csv_paths_to_relative(export_path, output_folder)
             if csv_conversions > 0:
                 self.emit_log(f"Converted {csv_conversions} CSV paths to relative")
             
             current_step += 1
-            self.progress_bar.setValue(current_step)
+            self._report_step(current_step)
 
             # 7. Detect remaining absolute paths and inform user
-            self.progress_label.setText("Checking for remaining absolute paths...")
+            self.archive_status.emit("Checking for remaining absolute paths...")
             remaining_paths = self._detect_remaining_absolute_paths(export_path)
             
             current_step += 1
-            self.progress_bar.setValue(current_step)
+            self._report_step(current_step)
 
             # 8. Create archive report
-            self.progress_label.setText("Creating archive report...")
+            self.archive_status.emit("Creating archive report...")
             self._create_archive_report(
                 str(output_folder), 
                 str(project_file), 
-                total_resized
+                total_resized,
+                max_pixels,
+                job['user_notes']
             )
             current_step += 1
-            self.progress_bar.setValue(current_step)
+            self._report_step(current_step)
 
-            self.progress_label.setText("Complete!")
+            self.archive_status.emit("Complete!")
             self.emit_log(f"✓ Successfully archived project '{project_name}' to {export_path}")
             
-            # Show summary of remaining paths if any found
-            if remaining_paths:
-                self._show_absolute_paths_summary(remaining_paths, output_folder)
-            else:
-                self.emit_log("✓ No remaining absolute paths detected")
-            
-            self.project_archived.emit(str(export_path))
+            return {'export_path': str(export_path), 'output_folder': output_folder, 'remaining_paths': remaining_paths}
             
         except Exception as e:
             self.emit_log(f"Error creating archive: {str(e)}")
+            return None
         finally:
-            self.emit_progress_finished()
-            self.progress_label.setVisible(False)
-            self.progress_bar.setVisible(False)
-            self.archive_btn.setEnabled(True)
+            shutil.rmtree(job['scratch_folder'], ignore_errors=True)
+
+    def _on_archive_finished(self, result):
+        """Wrap up on the GUI thread once the archive worker is done."""
+        self.end_operation()
+        self.progress_label.setVisible(False)
+        self.progress_bar.setVisible(False)
+        if result is None:
+            return
+        
+        # Show summary of remaining paths if any found
+        if result['remaining_paths']:
+            self._show_absolute_paths_summary(result['remaining_paths'], result['output_folder'])
+        else:
+            self.emit_log("✓ No remaining absolute paths detected")
+        
+        self.project_archived.emit(result['export_path'])
 
     def _clean_credentials_from_content(self, content):
         """Clean database credentials from QGS content using similar logic as clean_qgs_tab.py"""
-        changes_count = 0
-        cleaned_content = content
-        
-        # Remove user credentials
-        user_matches = re.findall(r'user=[\'"][^\'\"]*[\'"]|user=[^\s]+', cleaned_content)
-        changes_count += len(user_matches)
-        
-        # Remove user credentials (being very careful about spaces)
-        cleaned_content = re.sub(r'\s+user=[\'"][^\'\"]*[\'"]', '', cleaned_content)
-        cleaned_content = re.sub(r'\s+user=[^\s]+', '', cleaned_content)
-        cleaned_content = re.sub(r'user=[\'"][^\'\"]*[\'"]\s+', '', cleaned_content)
-        cleaned_content = re.sub(r'user=[^\s]+\s+', '', cleaned_content)
-        cleaned_content = re.sub(r'user=[\'"][^\'\"]*[\'"]', '', cleaned_content)
-        cleaned_content = re.sub(r'user=[^\s]+', '', cleaned_content)
-        
-        # Remove password credentials
-        password_matches = re.findall(r'password=[\'"][^\'\"]*[\'"]|password=[^\s]+', cleaned_content)
-        changes_count += len(password_matches)
-        
-        # Remove password credentials (being very careful about spaces)
-        cleaned_content = re.sub(r'\s+password=[\'"][^\'\"]*[\'"]', '', cleaned_content)
-        cleaned_content = re.sub(r'\s+password=[^\s]+', '', cleaned_content)
-        cleaned_content = re.sub(r'password=[\'"][^\'\"]*[\'"]\s+', '', cleaned_content)
-        cleaned_content = re.sub(r'password=[^\s]+\s+', '', cleaned_content)
-        cleaned_content = re.sub(r'password=[\'"][^\'\"]*[\'"]', '', cleaned_content)
-        cleaned_content = re.sub(r'password=[^\s]+', '', cleaned_content)
+        # Strip and count every credential in one scan (being very careful about spaces)
+        cleaned_content, changes_count = CREDENTIAL_RE.subn(b'', content)
         
         return cleaned_content, changes_count
 
-    def _update_project_sources_comprehensive(self, qgs_path, new_sources, postgresql_layers, gpkg_path):
-        """Comprehensive update of the project file to use geopackage sources and remove all PostgreSQL references"""
+    def _update_project_sources_comprehensive(self, qgs_path, new_sources, postgresql_layers, gpkg_path,
+                                              output_folder=None):
+        """Comprehensive update of the project file to use geopackage sources and remove all PostgreSQL references
+        
+        With output_folder, CSV paths are made relative in the same parse and the number
+        of conversions is returned; None is returned if the update failed.
+        """
         try:
-            # Read the file content
-            with open(str(qgs_path), 'r', encoding='utf-8') as f:
+            # Read the raw file content; it is cleaned and parsed as bytes, so the document
+            # is never decoded into a str and encoded back just to reach the parser
+            with open(str(qgs_path), 'rb') as f:
                 content = f.read()
             
             # Clean database credentials first
@@ -835,121 +1386,113 @@ class ArchiveProjectTab(BaseTab):
                 self.emit_log(f"Removed {creds_removed} database credential(s)")
             
             # Parse the XML
-            root = ET.fromstring(content)
-            
-            # Create layer ID to layer name mapping for easier lookup
-            layer_id_to_name = {}
-            for layer_id, layer in QgsProject.instance().mapLayers().items():
-                if layer_id in new_sources:
-                    layer_name = layer.name().replace(' ', '_').replace('/', '_')
-                    layer_id_to_name[layer_id] = layer_name
-            
-            # 1. Update basic maplayer elements
-            maplayers = root.findall(".//maplayer")
-            for maplayer in maplayers:
-                layer_id = maplayer.get("id") or maplayer.findtext("id")
+            root = etree.fromstring(content, XML_PARSER)
+            
+            # Visit every element once, dispatching on its tag, instead of running a separate
+            # descendant search over the whole tree for each kind of element
+            atlas_updated = gps_settings_updated = False
+            for elem in root.iter():
+                tag = elem.tag
                 
-                if layer_id in new_sources:
-                    # Update datasource
-                    datasource_elem = maplayer.find("datasource")
-                    if datasource_elem is not None:
-                        datasource_elem.text = new_sources[layer_id]
+                # 1. Update basic maplayer elements
+                if tag == "maplayer":
+                    layer_id = elem.get("id") or elem.findtext("id")
                     
-                    # Update provider to 'ogr' for geopackage
-                    provider_elem = maplayer.find("provider")
-                    if provider_elem is not None:
-                        provider_elem.text = "ogr"
+                    if layer_id in new_sources:
+                        # Update datasource
+                        datasource_elem = elem.find("datasource")
+                        if datasource_elem is not None:
+                            datasource_elem.text = new_sources[layer_id]
+                        
+                        # Update provider to 'ogr' for geopackage
+                        provider_elem = elem.find("provider")
+                        if provider_elem is not None:
+                            provider_elem.text = "ogr"
+                        
+                        self.emit_log(f"Updated maplayer {layer_id} source in project file")
+                
+                # 2. Update layer-tree-layer elements (providerKey and source attributes)
+                elif tag == "layer-tree-layer":
+                    layer_id = elem.get("id")
                     
-                    self.emit_log(f"Updated maplayer {layer_id} source in project file")
-            
-            # 2. Update layer-tree-layer elements (providerKey and source attributes)
-            layer_tree_layers = root.findall(".//layer-tree-layer")
-            for layer_tree_layer in layer_tree_layers:
-                layer_id = layer_tree_layer.get("id")
+                    if layer_id in new_sources:
+                        # Update providerKey attribute
+                        elem.set("providerKey", "ogr")
+                        
+                        # Update source attribute
+                        elem.set("source", new_sources[layer_id])
+                        
+                        self.emit_log(f"Updated layer-tree-layer {layer_id} in project file")
                 
-                if layer_id in new_sources:
-                    # Update providerKey attribute
-                    layer_tree_layer.set("providerKey", "ogr")
+                # 3. Update relation elements
+                elif tag == "relation":
+                    # Update referencingLayer dataSource
+                    referencing_layer = elem.get("referencingLayer")
+                    if referencing_layer in new_sources:
+                        elem.set("dataSource", new_sources[referencing_layer])
                     
-                    # Update source attribute
-                    layer_tree_layer.set("source", new_sources[layer_id])
+                    # Update referencedLayer dataSource  
+                    referenced_layer = elem.get("referencedLayer")
+                    if referenced_layer in new_sources:
+                        elem.set("dataSource", new_sources[referenced_layer])
                     
-                    self.emit_log(f"Updated layer-tree-layer {layer_id} in project file")
-            
-            # 3. Update relation elements
-            relations = root.findall(".//relation")
-            for relation in relations:
-                # Update referencingLayer dataSource
-                referencing_layer = relation.get("referencingLayer")
-                if referencing_layer in new_sources:
-                    relation.set("dataSource", new_sources[referencing_layer])
+                    # Update providerKey
+                    if referencing_layer in new_sources or referenced_layer in new_sources:
+                        elem.set("providerKey", "ogr")
+                
+                # 4. Update Layer elements in project styles
+                elif tag == "Layer":
+                    source = elem.get("source")
+                    if source and ("postgres" in source.lower() or "dbname=" in source):
+                        # Try to find matching layer by source pattern
+                        for layer_id, new_source in new_sources.items():
+                            # This is a simplified matching - you might want to improve this
+                            if layer_id in source or any(part in source for part in source.split()):
+                                elem.set("source", new_source)
+                                elem.set("provider", "ogr")
+                                break
                 
-                # Update referencedLayer dataSource  
-                referenced_layer = relation.get("referencedLayer")
-                if referenced_layer in new_sources:
-                    relation.set("dataSource", new_sources[referenced_layer])
+                # 5. Update LayerStyle elements
+                elif tag == "LayerStyle":
+                    layer_id = elem.get("layerid")
+                    if layer_id in new_sources:
+                        elem.set("source", new_sources[layer_id])
+                        elem.set("provider", "ogr")
                 
-                # Update providerKey
-                if referencing_layer in new_sources or referenced_layer in new_sources:
-                    relation.set("providerKey", "ogr")
-            
-            # 4. Update Layer elements in project styles
-            layer_elements = root.findall(".//Layer")
-            for layer_elem in layer_elements:
-                source = layer_elem.get("source")
-                if source and ("postgres" in source.lower() or "dbname=" in source):
-                    # Try to find matching layer by source pattern
-                    for layer_id, new_source in new_sources.items():
-                        # This is a simplified matching - you might want to improve this
-                        if layer_id in source or any(part in source for part in source.split()):
-                            layer_elem.set("source", new_source)
-                            layer_elem.set("provider", "ogr")
-                            break
-            
-            # 5. Update LayerStyle elements
-            layer_styles = root.findall(".//LayerStyle")
-            for layer_style in layer_styles:
-                layer_id = layer_style.get("layerid")
-                if layer_id in new_sources:
-                    layer_style.set("source", new_sources[layer_id])
-                    layer_style.set("provider", "ogr")
-            
-            # 6. Update Atlas configuration
-            atlas = root.find(".//Atlas")
-            if atlas is not None:
-                coverage_layer = atlas.get("coverageLayer")
-                if coverage_layer in new_sources:
-                    atlas.set("coverageLayer", coverage_layer)
-                    atlas.set("coverageLayerSource", new_sources[coverage_layer])
-                    atlas.set("coverageLayerProvider", "ogr")
-            
-            # 7. Update GPS settings
-            gps_settings = root.find(".//ProjectGpsSettings")
-            if gps_settings is not None:
-                dest_layer = gps_settings.get("destinationLayer")
-                if dest_layer in new_sources:
-                    gps_settings.set("destinationLayerSource", new_sources[dest_layer])
-                    gps_settings.set("destinationLayerProvider", "ogr")
-            
-            # 8. Update Option elements with LayerProviderName
-            option_elements = root.findall(".//Option[@name='LayerProviderName']")
-            for option_elem in option_elements:
-                if option_elem.get("value") == "postgres":
-                    option_elem.set("value", "ogr")
+                # 6. Update Atlas configuration (the first one in the document)
+                elif tag == "Atlas" and not atlas_updated:
+                    atlas_updated = True
+                    coverage_layer = elem.get("coverageLayer")
+                    if coverage_layer in new_sources:
+                        elem.set("coverageLayer", coverage_layer)
+                        elem.set("coverageLayerSource", new_sources[coverage_layer])
+                        elem.set("coverageLayerProvider", "ogr")
+                
+                # 7. Update GPS settings (the first one in the document)
+                elif tag == "ProjectGpsSettings" and not gps_settings_updated:
+                    gps_settings_updated = True
+                    dest_layer = elem.get("destinationLayer")
+                    if dest_layer in new_sources:
+                        elem.set("destinationLayerSource", new_sources[dest_layer])
+                        elem.set("destinationLayerProvider", "ogr")
+                
+                # 8. Update Option elements with LayerProviderName
+                elif tag == "Option" and elem.get("name") == "LayerProviderName":
+                    if elem.get("value") == "postgres":
+                        elem.set("value", "ogr")
+            
+            # Make CSV paths relative while the tree is parsed anyway
+            csv_conversions = 0
+            if output_folder is not None:
+                csv_conversions = self._convert_csv_paths_in_tree(root, output_folder)
             
             # 9. Clean up any remaining PostgreSQL references in the serialized content
-            content = ET.tostring(root, encoding='unicode')
+            content = etree.tostring(root, encoding='unicode')
             
             # Additional text-based cleanup for any missed references
-            # Replace remaining postgres provider references
-            content = re.sub(r'providerKey="postgres"', 'providerKey="ogr"', content)
-            content = re.sub(r"providerKey='postgres'", "providerKey='ogr'", content)
-            content = re.sub(r'provider="postgres"', 'provider="ogr"', content)
-            content = re.sub(r"provider='postgres'", "provider='ogr'", content)
-            
-            # Replace LayerProviderName values
-            content = re.sub(r'<Option name="LayerProviderName" type="QString" value="postgres" />',
-                           '<Option name="LayerProviderName" type="QString" value="ogr" />', content)
+            # Replace remaining postgres provider references (one quick scan decides whether any are left)
+            if '"postgres"' in content or "'postgres'" in content:
+                content = _replace_all(content, POSTGRES_PROVIDER_REPLACEMENTS)
             
             # Write the updated XML back to file
             with open(str(qgs_path), 'w', encoding='utf-8') as f:
@@ -957,9 +1500,11 @@ class ArchiveProjectTab(BaseTab):
                 f.write(content)
             
             self.emit_log("Comprehensive project file update completed")
+            return csv_conversions
             
         except Exception as e:
             self.emit_log(f"Error updating project file: {str(e)}")
+            return None
 
     def _set_default_output_folder(self):
         documents = os.path.expanduser("~/Documents")
@@ -2,22 +2,32 @@
 Base tab class with common functionality for PostgreSQL Template Manager tabs.
 """
 
-from qgis.PyQt.QtCore import QObject, pyqtSignal
-from qgis.PyQt.QtWidgets import QWidget, QMessageBox
+from contextlib import contextmanager
 
+from qgis.PyQt.QtCore import QObject, QStringListModel, pyqtSignal
+from qgis.PyQt.QtWidgets import QComboBox, QWidget, QMessageBox
 
-class BaseTab(QWidget):
-    """Base class for all tab widgets."""
+
+class LogBus(QObject):
+    """Shared channel carrying log and progress signals from all tabs to the dialog."""
     
-    # Signals
     log_message = pyqtSignal(str)
     progress_started = pyqtSignal()
     progress_finished = pyqtSignal()
+
+
+class BaseTab(QWidget):
+    """Base class for all tab widgets."""
     
     def __init__(self, db_manager, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
         self.parent_dialog = parent
+        # Use the dialog's bus so it only has to connect once for all tabs
+        self.log_bus = getattr(parent, 'log_bus', None) or LogBus(self)
+        # Buttons disabled while this tab's background operations are running
+        self._busy_buttons = ()
+        self._pending_operations = 0
         self.setup_ui()
         self.connect_signals()
     
@@ -56,15 +66,33 @@ class BaseTab(QWidget):
     
     def emit_log(self, message):
         """Emit log message signal."""
-        self.log_message.emit(message)
+        self.log_bus.log_message.emit(message)
     
     def emit_progress_started(self):
         """Emit progress started signal."""
-        self.progress_started.emit()
+        self.log_bus.progress_started.emit()
     
     def emit_progress_finished(self):
         """Emit progress finished signal."""
-        self.progress_finished.emit()
+        self.log_bus.progress_finished.emit()
+    
+    def begin_operation(self, *buttons, count=1):
+        """Disable buttons and show progress until count operations have finished."""
+        self._busy_buttons = buttons
+        self._pending_operations = count
+        for button in buttons:
+            button.setEnabled(False)
+        self.emit_progress_started()
+    
+    def end_operation(self):
+        """Mark one operation finished, re-enabling the buttons after the last one."""
+        if self._pending_operations > 0:
+            self._pending_operations -= 1
+            if self._pending_operations == 0:
+                for button in self._busy_buttons:
+                    button.setEnabled(True)
+                self._busy_buttons = ()
+        self.emit_progress_finished()
     
     def check_user_privileges(self, required_privilege='can_create_db'):
         """Check if user has required privileges."""
@@ -77,6 +105,46 @@ class BaseTab(QWidget):
         
         return True
     
+    def create_list_combo(self):
+        """Create a combo box backed by a string list model for cheap bulk updates."""
+        combo = QComboBox()
+        combo.setModel(QStringListModel(combo))
+        return combo
+    
+    @contextmanager
+    def filling_table(self, table, row_count):
+        """Give table row_count rows for the caller to fill, with sorting paused meanwhile.
+        
+        Sorting would move rows while they are being filled.
+        """
+        table.setSortingEnabled(False)
+        table.setRowCount(row_count)
+        try:
+            yield
+        finally:
+            table.setSortingEnabled(True)
+    
+    def set_combo_items(self, combo, items, select=None):
+        """Replace the items of a list combo in one model reset.
+        
+        Keeps the current (or the given) selection when it is still present and emits
+        currentTextChanged once, only if the selected text actually changed.
+        """
+        items = list(items)
+        previous = combo.currentText()
+        preferred = select if select in items else previous
+        
+        combo.blockSignals(True)
+        combo.model().setStringList(items)
+        if preferred in items:
+            combo.setCurrentIndex(items.index(preferred))
+        else:
+            combo.setCurrentIndex(0 if items else -1)
+        combo.blockSignals(False)
+        
+        if combo.currentText() != previous:
+            combo.currentTextChanged.emit(combo.currentText())
+    
     def validate_non_empty_field(self, field_value, field_name):
         """Validate that a field is not empty."""
         if not field_value.strip():
@@ -4,6 +4,8 @@ Clean QGS tab for removing database credentials from QGIS project files.
 
 import os
 import re
+import tempfile
+import zipfile
 import xml.etree.ElementTree as ET
 from qgis.PyQt.QtCore import pyqtSignal
 from qgis.PyQt.QtWidgets import (QVBoxLayout, QHBoxLayout, QFormLayout, 
@@ -331,7 +333,6 @@ class CleanQGSTab(BaseTab):
         """Read QGS file content (handles both .qgs and .qgz files)."""
         try:
             if file_path.endswith('.qgz'):
-                import zipfile
                 with zipfile.ZipFile(file_path, 'r') as zip_file:
                     # Find the .qgs file in the archive
                     qgs_files = [f for f in zip_file.namelist() if f.endswith('.qgs')]
@@ -350,9 +351,6 @@ class CleanQGSTab(BaseTab):
     def _write_qgs_file(self, output_path, content, is_qgz=False):
         """Write QGS file content (handles both .qgs and .qgz files)."""
         if is_qgz:
-            import zipfile
-            import tempfile
-            
             # Create a temporary .qgs file
             with tempfile.NamedTemporaryFile(mode='w', suffix='.qgs', delete=False, encoding='utf-8') as temp_file:
                 temp_file.write(content)
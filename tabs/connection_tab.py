@@ -6,9 +6,15 @@ from qgis.PyQt.QtCore import QSettings, pyqtSignal
 from qgis.PyQt.QtWidgets import (QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, 
                                 QSpinBox, QPushButton, QLabel, QMessageBox)
 from qgis.PyQt.QtGui import QFont
+from ..database_manager import OP_TEST_CONNECTION
 from .base_tab import BaseTab
 
 
+# Connection status label styles
+CONNECTED_STYLE = "color: green;"
+DISCONNECTED_STYLE = "color: red;"
+
+
 class ConnectionTab(BaseTab):
     """Tab for managing database connections."""
     
@@ -17,6 +23,8 @@ class ConnectionTab(BaseTab):
     
     def __init__(self, db_manager, parent=None):
         super().__init__(db_manager, parent)
+        # Settings as last read from or written to QSettings
+        self._saved_settings = {}
         self.load_settings()
     
     def setup_ui(self):
@@ -75,7 +83,7 @@ class ConnectionTab(BaseTab):
         
         # Connection status
         self.conn_status = QLabel("Not connected")
-        self.conn_status.setStyleSheet("color: red;")
+        self.conn_status.setStyleSheet(DISCONNECTED_STYLE)
         form_layout.addWidget(self.conn_status)
         
         layout.addLayout(form_layout)
@@ -146,22 +154,22 @@ class ConnectionTab(BaseTab):
             host, port, 'postgres', username, password
         )
         
-        self.emit_progress_started()
-        self.db_manager.test_connection()
+        self.begin_operation(self.test_conn_btn)
+        self.db_manager.run_in_background(self.db_manager.test_connection)
     
-    def on_operation_finished(self, success, message):
+    def on_operation_finished(self, success, message, operation):
         """Handle operation finished signal."""
-        self.emit_progress_finished()
-        
-        if "Connection" in message:
+        if operation == OP_TEST_CONNECTION:
+            self.end_operation()
+            
             if success:
                 self.conn_status.setText("Connected")
-                self.conn_status.setStyleSheet("color: green;")
+                self.conn_status.setStyleSheet(CONNECTED_STYLE)
                 self.emit_log(f"✓ {message}")
                 self.save_settings()
             else:
                 self.conn_status.setText("Connection failed")
-                self.conn_status.setStyleSheet("color: red;")
+                self.conn_status.setStyleSheet(DISCONNECTED_STYLE)
                 self.emit_log(f"✗ {message}")
             
             self.connection_status_changed.emit(success, message)
@@ -180,19 +188,34 @@ class ConnectionTab(BaseTab):
         return bool(self.db_manager.connection_params)
     
     def save_settings(self):
-        """Save connection settings."""
+        """Save connection settings if they changed since they were last read or written."""
+        values = {
+            'host': self.host_edit.text(),
+            'port': self.port_edit.value(),
+            'username': self.username_edit.text()
+        }
+        if values == self._saved_settings:
+            return
+        
         settings = QSettings()
         settings.beginGroup("PostgreSQLTemplateManager")
-        settings.setValue("host", self.host_edit.text())
-        settings.setValue("port", self.port_edit.value())
-        settings.setValue("username", self.username_edit.text())
+        for key, value in values.items():
+            settings.setValue(key, value)
         settings.endGroup()
+        self._saved_settings = values
     
     def load_settings(self):
         """Load connection settings."""
         settings = QSettings()
         settings.beginGroup("PostgreSQLTemplateManager")
-        self.host_edit.setText(settings.value("host", "localhost"))
-        self.port_edit.setValue(int(settings.value("port", 5432)))
-        self.username_edit.setText(settings.value("username", ""))
-        settings.endGroup()
\ No newline at end of file
+        stored = {key: settings.value(key) for key in settings.childKeys()}
+        settings.endGroup()
+        
+        self.host_edit.setText(stored.get("host", "localhost"))
+        self.port_edit.setValue(int(stored.get("port", 5432)))
+        self.username_edit.setText(stored.get("username", ""))
+        self._saved_settings = {
+            'host': self.host_edit.text(),
+            'port': self.port_edit.value(),
+            'username': self.username_edit.text()
+        }
\ No newline at end of file
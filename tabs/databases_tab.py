@@ -3,15 +3,22 @@ Databases tab for PostgreSQL Template Manager with database deletion functionali
 Enhanced with comment display and ability to create from templates OR existing databases.
 """
 
+import re
+
 from qgis.PyQt.QtCore import pyqtSignal, Qt
-from qgis.PyQt.QtWidgets import (QVBoxLayout, QHBoxLayout, QFormLayout, QComboBox, 
+from qgis.PyQt.QtWidgets import (QVBoxLayout, QHBoxLayout, QFormLayout, 
                                 QLineEdit, QPushButton, QGroupBox, QTableWidget, QTableWidgetItem,
                                 QLabel, QMessageBox, QDialog, QCheckBox, QTextEdit,
                                 QFrame, QSizePolicy, QHeaderView, QRadioButton, QButtonGroup)
 from qgis.PyQt.QtGui import QFont, QPixmap
+from ..database_manager import OP_CREATE_DATABASE, OP_DELETE_DATABASE
 from .base_tab import BaseTab
 
 
+# PostgreSQL database names: letters, numbers, underscores, start with letter/underscore
+DATABASE_NAME_RE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+
+
 class DatabaseDeletionDialog(QDialog):
     """
     Single-step confirmation dialog for database deletion with strong warning.
@@ -263,7 +270,7 @@ class DatabasesTab(BaseTab):
         create_layout.addRow("Source Type:", source_type_layout)
         
         # Source selection combo
-        self.source_combo = QComboBox()
+        self.source_combo = self.create_list_combo()
         self.source_label = QLabel("Template:")
         create_layout.addRow(self.source_label, self.source_combo)
         
@@ -346,14 +353,9 @@ class DatabasesTab(BaseTab):
 
     def refresh_source_combo(self):
         """Refresh the source combo box based on selected source type."""
-        current_selection = self.source_combo.currentText()
-        self.source_combo.clear()
-        
         if self.from_template_radio.isChecked():
             # Show templates
-            self.source_combo.addItems(self.current_templates)
-            if current_selection in self.current_templates:
-                self.source_combo.setCurrentText(current_selection)
+            self.set_combo_items(self.source_combo, self.current_templates)
         else:
             # Show databases (excluding system databases and current database)
             available_databases = []
@@ -362,9 +364,7 @@ class DatabasesTab(BaseTab):
                     db_name != self.db_manager.connection_params.get('database')):
                     available_databases.append(db_name)
             
-            self.source_combo.addItems(available_databases)
-            if current_selection in available_databases:
-                self.source_combo.setCurrentText(current_selection)
+            self.set_combo_items(self.source_combo, available_databases)
 
     def _show_help_popup(self):
         """Show help information in a popup dialog."""
@@ -447,25 +447,21 @@ class DatabasesTab(BaseTab):
         
         try:
             databases_with_comments = self.db_manager.get_databases_with_comments()
-            self.databases_table.setRowCount(0)  # Clear existing rows
-            
-            database_names = []
-            for row, (db_name, comment) in enumerate(databases_with_comments):
-                database_names.append(db_name)
-                
-                # Insert new row
-                self.databases_table.insertRow(row)
-                
-                # Database name item
-                name_item = QTableWidgetItem(db_name)
-                name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)  # Make read-only
-                self.databases_table.setItem(row, 0, name_item)
-                
-                # Comment item
-                comment_text = comment if comment else "(No comment)"
-                comment_item = QTableWidgetItem(comment_text)
-                comment_item.setFlags(comment_item.flags() & ~Qt.ItemIsEditable)  # Make read-only
-                self.databases_table.setItem(row, 1, comment_item)
+            with self.filling_table(self.databases_table, len(databases_with_comments)):
+                database_names = []
+                for row, (db_name, comment) in enumerate(databases_with_comments):
+                    database_names.append(db_name)
+                    
+                    # Database name item
+                    name_item = QTableWidgetItem(db_name)
+                    name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)  # Make read-only
+                    self.databases_table.setItem(row, 0, name_item)
+                    
+                    # Comment item
+                    comment_text = comment if comment else "(No comment)"
+                    comment_item = QTableWidgetItem(comment_text)
+                    comment_item.setFlags(comment_item.flags() & ~Qt.ItemIsEditable)  # Make read-only
+                    self.databases_table.setItem(row, 1, comment_item)
             
             # Update current databases list
             self.current_databases = database_names
@@ -516,20 +512,26 @@ class DatabasesTab(BaseTab):
         if not self.check_user_privileges():
             return
         
-        self.emit_progress_started()
+        self.begin_operation(self.create_db_btn, self.delete_db_btn)
         
         if self.from_template_radio.isChecked():
             # Create from template
-            self.db_manager.create_database_from_template(source_name, new_db_name, db_comment)
+            self.db_manager.run_in_background(
+                self.db_manager.create_database_from_template, source_name, new_db_name, db_comment
+            )
         else:
             # Create from existing database
             # Check if the database manager has the method for creating from database
             if hasattr(self.db_manager, 'create_database_from_database'):
-                self.db_manager.create_database_from_database(source_name, new_db_name, db_comment)
+                self.db_manager.run_in_background(
+                    self.db_manager.create_database_from_database, source_name, new_db_name, db_comment
+                )
             else:
                 # Fallback: use template method with a warning
                 self.emit_log("⚠️ Warning: Creating database copy using template method")
-                self.db_manager.create_database_from_template(source_name, new_db_name, db_comment)
+                self.db_manager.run_in_background(
+                    self.db_manager.create_database_from_template, source_name, new_db_name, db_comment
+                )
     
     def delete_database(self):
         """Delete selected database with confirmation."""
@@ -567,22 +569,24 @@ class DatabasesTab(BaseTab):
         
         if result == QDialog.Accepted:
             # User confirmed deletion - execute immediately
-            self.emit_progress_started()
+            self.begin_operation(self.create_db_btn, self.delete_db_btn)
             self.emit_log(f"🔥 DELETING database '{db_name}'")
-            self.db_manager.delete_database(db_name, force_drop_connections=True)
+            self.db_manager.run_in_background(
+                self.db_manager.delete_database, db_name, force_drop_connections=True
+            )
         else:
             self.emit_log(f"Database deletion cancelled by user.")
     
-    def on_operation_finished(self, success, message):
+    def on_operation_finished(self, success, message, operation):
         """Handle operation finished signal."""
-        if any(keyword in message.lower() for keyword in ["database", "template"]):
-            self.emit_progress_finished()
+        if operation in (OP_CREATE_DATABASE, OP_DELETE_DATABASE):
+            self.end_operation()
             
             if success:
                 self.emit_log(f"✅ {message}")
                 
                 # Clear form and refresh if it was a creation
-                if "created successfully" in message.lower():
+                if operation == OP_CREATE_DATABASE:
                     self.new_db_name_edit.clear()
                     self.db_comment_edit.clear()
                 
@@ -602,7 +606,4 @@ class DatabasesTab(BaseTab):
     
     def _is_valid_database_name(self, name):
         """Validate database name format."""
-        import re
-        # PostgreSQL database names: letters, numbers, underscores, start with letter/underscore
-        pattern = r'^[a-zA-Z_][a-zA-Z0-9_]*$'
-        return bool(re.match(pattern, name)) and len(name) <= 63
\ No newline at end of file
+        return bool(DATABASE_NAME_RE.match(name)) and len(name) <= 63
\ No newline at end of file
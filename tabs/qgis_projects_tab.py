@@ -7,6 +7,7 @@ from qgis.PyQt.QtWidgets import (QVBoxLayout, QHBoxLayout, QFormLayout,
                                 QComboBox, QLineEdit, QSpinBox, QPushButton, 
                                 QGroupBox, QLabel, QCheckBox, QMessageBox)
 from qgis.PyQt.QtGui import QFont
+from ..database_manager import OP_FIX_PROJECT
 from .base_tab import BaseTab
 
 
@@ -56,7 +57,7 @@ class QGISProjectsTab(BaseTab):
         db_layout = QVBoxLayout(db_section)
         
         db_select_layout = QHBoxLayout()
-        self.qgis_db_combo = QComboBox()
+        self.qgis_db_combo = self.create_list_combo()
         self.refresh_qgis_db_btn = QPushButton("Refresh")
 
         self.refresh_qgis_db_btn.clicked.connect(lambda: self.refresh_qgis_databases())
@@ -97,6 +98,14 @@ class QGISProjectsTab(BaseTab):
         self.source_schema_edit = QLineEdit()
         self.target_schema_edit = QLineEdit()
         
+        # Datasource parameters taken verbatim from their line edit when filled in
+        self._connection_fields = (
+            ('dbname', self.new_dbname_edit),
+            ('host', self.new_host_edit),
+            ('user', self.new_user_edit),
+            ('password', self.new_password_edit),
+        )
+        
         params_layout.addRow("New DB Name:", self.new_dbname_edit)
         params_layout.addRow("New Host:", self.new_host_edit)
         params_layout.addRow("New User:", self.new_user_edit)
@@ -164,8 +173,7 @@ class QGISProjectsTab(BaseTab):
                 self.emit_log(f"Error refreshing QGIS databases: {str(e)}")
                 return
         
-        self.qgis_db_combo.clear()
-        self.qgis_db_combo.addItems(databases)
+        self.set_combo_items(self.qgis_db_combo, databases)
         self.emit_log(f"Refreshed QGIS databases: {len(databases)} found")
     
     def search_qgis_projects(self):
@@ -177,15 +185,22 @@ class QGISProjectsTab(BaseTab):
         if not self.validate_selection(self.qgis_db_combo, "database"):
             return
         
-        self.emit_progress_started()
-        
+        self.begin_operation(self.search_projects_btn)
+        self.db_manager.run_in_background(
+            self.db_manager.find_qgis_projects, selected_db,
+            callback=lambda projects: self._on_projects_found(selected_db, projects)
+        )
+    
+    def _on_projects_found(self, selected_db, projects):
+        """Populate the projects combo once the background search has finished."""
         try:
-            projects = self.db_manager.find_qgis_projects(selected_db)
-            
             self.qgis_projects_combo.clear()
             if projects:
-                project_items = [f"{p['schema']}.{p['table']} - {p['name']}" for p in projects]
-                self.qgis_projects_combo.addItems(project_items)
+                # Keep the project's location as item data so it never has to be parsed back
+                for p in projects:
+                    self.qgis_projects_combo.addItem(
+                        f"{p['schema']}.{p['table']} - {p['name']}", (p['schema'], p['table'], p['name'])
+                    )
                 self.emit_log(f"Found {len(projects)} QGIS projects in {selected_db}")
                 self.projects_found.emit(projects)
             else:
@@ -194,7 +209,7 @@ class QGISProjectsTab(BaseTab):
         except Exception as e:
             self.emit_log(f"Error searching for QGIS projects: {str(e)}")
         
-        self.emit_progress_finished()
+        self.end_operation()
     
     def fix_qgis_project(self):
         """Fix selected QGIS project layers."""
@@ -202,20 +217,13 @@ class QGISProjectsTab(BaseTab):
             return
         
         selected_db = self.qgis_db_combo.currentText()
-        selected_project = self.qgis_projects_combo.currentText()
         
         if not self.validate_selection(self.qgis_db_combo, "database"):
             return
         if not self.validate_selection(self.qgis_projects_combo, "project"):
             return
         
-        # Parse project info
-        try:
-            schema_table, project_name = selected_project.split(" - ", 1)
-            schema, table = schema_table.split(".", 1)
-        except ValueError:
-            self.show_error("Invalid project selection format.")
-            return
+        schema, table, project_name = self.qgis_projects_combo.currentData()
         
         # Collect new connection parameters
         new_params = self._collect_new_parameters()
@@ -226,8 +234,9 @@ class QGISProjectsTab(BaseTab):
         
         create_backup = self.create_backup_checkbox.isChecked()
         
-        self.emit_progress_started()
-        self.db_manager.fix_qgis_project_layers(
+        self.begin_operation(self.fix_project_btn)
+        self.db_manager.run_in_background(
+            self.db_manager.fix_qgis_project_layers,
             selected_db, schema, table, project_name, new_params, create_backup
         )
     
@@ -235,16 +244,14 @@ class QGISProjectsTab(BaseTab):
         """Collect new connection parameters from form fields."""
         new_params = {}
         
-        if self.new_dbname_edit.text().strip():
-            new_params['dbname'] = self.new_dbname_edit.text().strip()
-        if self.new_host_edit.text().strip():
-            new_params['host'] = self.new_host_edit.text().strip()
-        if self.new_user_edit.text().strip():
-            new_params['user'] = self.new_user_edit.text().strip()
-        if self.new_port_edit.value() != 5432:
-            new_params['port'] = str(self.new_port_edit.value())
-        if self.new_password_edit.text().strip():
-            new_params['password'] = self.new_password_edit.text().strip()
+        for key, edit in self._connection_fields:
+            value = edit.text().strip()
+            if value:
+                new_params[key] = value
+        
+        port = self.new_port_edit.value()
+        if port != 5432:
+            new_params['port'] = str(port)
         
         # Handle schema remapping logic
         source_schema = self.source_schema_edit.text().strip()
@@ -278,10 +285,10 @@ class QGISProjectsTab(BaseTab):
         self.source_schema_edit.clear()
         self.target_schema_edit.clear()
     
-    def on_operation_finished(self, success, message):
+    def on_operation_finished(self, success, message, operation):
         """Handle operation finished signal."""
-        if any(keyword in message for keyword in ["project", "Project", "layers", "Layers"]):
-            self.emit_progress_finished()
+        if operation == OP_FIX_PROJECT:
+            self.end_operation()
             
             if success:
                 self.emit_log(f"✓ {message}")
@@ -3,13 +3,16 @@ Templates tab for PostgreSQL Template Manager.
 Enhanced with connection handling and user warnings.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 from qgis.PyQt.QtCore import pyqtSignal
 from qgis.PyQt.QtWidgets import (QVBoxLayout, QHBoxLayout, QFormLayout, 
-                                QComboBox, QLineEdit, QPushButton, QGroupBox,
+                                QLineEdit, QPushButton, QGroupBox,
                                 QTableWidget, QTableWidgetItem, QMessageBox, QDialog, QDialogButtonBox,
                                 QLabel, QTextEdit, QHeaderView, QCheckBox)
 from qgis.PyQt.QtCore import Qt
 from qgis.PyQt.QtGui import QFont
+from ..database_manager import ADMIN_POOL_MAX_CONNECTIONS, OP_CREATE_TEMPLATE, OP_DELETE_TEMPLATE
 from .base_tab import BaseTab
 
 
@@ -133,7 +136,7 @@ class TemplatesTab(BaseTab):
         create_group = QGroupBox("Create Template")
         create_layout = QFormLayout(create_group)
         
-        self.source_db_combo = QComboBox()
+        self.source_db_combo = self.create_list_combo()
         self.template_name_edit = QLineEdit()
         
         # Add comment field
@@ -151,6 +154,16 @@ class TemplatesTab(BaseTab):
         self.exclude_schemas_edit.setPlaceholderText("Comma-separated list of schemas to preserve (e.g., listen, metadata, system)")
         self.exclude_schemas_edit.setToolTip("Enter schema names separated by commas. Tables in these schemas will not be truncated and their data will be preserved in the template")
         
+        # Add opt-in for restoring the template from a schema-only dump
+        self.schema_only_checkbox = QCheckBox("Copy schema only with pg_dump (faster for large databases)")
+        self.schema_only_checkbox.setChecked(False)
+        self.schema_only_checkbox.setToolTip(
+            "Restore the template from a schema-only pg_dump instead of cloning the database and truncating it. "
+            "Needs pg_dump and psql on this machine, no preserved data, and a pg_dump at least as new as the server. "
+            "Unlike the clone, sequences start over and rows added to extension configuration tables "
+            "(e.g. custom spatial_ref_sys entries) are not copied."
+        )
+        
         self.create_template_btn = QPushButton("Create Template")
         self.create_template_btn.clicked.connect(self.create_template)
         
@@ -159,6 +172,7 @@ class TemplatesTab(BaseTab):
         create_layout.addRow("Comment:", self.template_comment_edit)
         create_layout.addRow("", self.protect_qgis_projects_checkbox)
         create_layout.addRow("Exclude Schemas <br>from truncate:", self.exclude_schemas_edit)
+        create_layout.addRow("", self.schema_only_checkbox)
         create_layout.addWidget(self.create_template_btn)
         
         layout.addWidget(create_group)
@@ -183,7 +197,7 @@ class TemplatesTab(BaseTab):
         self.templates_table.setColumnCount(2)
         self.templates_table.setHorizontalHeaderLabels(["Template Name", "Comment"])
         self.templates_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.templates_table.setSelectionMode(QTableWidget.SingleSelection)
+        self.templates_table.setSelectionMode(QTableWidget.ExtendedSelection)
         self.templates_table.horizontalHeader().setStretchLastSection(True)
         self.templates_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         self.templates_table.setSortingEnabled(True)
@@ -245,28 +259,24 @@ class TemplatesTab(BaseTab):
         
         try:
             templates_with_comments = self.db_manager.get_templates_with_comments()
-            self.templates_table.setRowCount(0)  # Clear existing rows
-            
-            template_names = []
-            for row, (template_name, comment) in enumerate(templates_with_comments):
-                template_names.append(template_name)
-                
-                # Debug: Log what we're getting
-                self.emit_log(f"Debug: Template '{template_name}', Comment: '{comment}'")
-                
-                # Insert new row
-                self.templates_table.insertRow(row)
-                
-                # Template name item
-                name_item = QTableWidgetItem(template_name)
-                name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)  # Make read-only
-                self.templates_table.setItem(row, 0, name_item)
-                
-                # Comment item
-                comment_text = comment if comment else "(No comment)"
-                comment_item = QTableWidgetItem(comment_text)
-                comment_item.setFlags(comment_item.flags() & ~Qt.ItemIsEditable)  # Make read-only
-                self.templates_table.setItem(row, 1, comment_item)
+            with self.filling_table(self.templates_table, len(templates_with_comments)):
+                template_names = []
+                for row, (template_name, comment) in enumerate(templates_with_comments):
+                    template_names.append(template_name)
+                    
+                    # Debug: Log what we're getting
+                    self.emit_log(f"Debug: Template '{template_name}', Comment: '{comment}'")
+                    
+                    # Template name item
+                    name_item = QTableWidgetItem(template_name)
+                    name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)  # Make read-only
+                    self.templates_table.setItem(row, 0, name_item)
+                    
+                    # Comment item
+                    comment_text = comment if comment else "(No comment)"
+                    comment_item = QTableWidgetItem(comment_text)
+                    comment_item.setFlags(comment_item.flags() & ~Qt.ItemIsEditable)  # Make read-only
+                    self.templates_table.setItem(row, 1, comment_item)
             
             self.emit_log(f"Refreshed templates: {len(templates_with_comments)} found")
             self.templates_refreshed.emit(template_names)
@@ -275,8 +285,7 @@ class TemplatesTab(BaseTab):
     
     def refresh_source_databases(self, databases):
         """Refresh source databases combo box."""
-        self.source_db_combo.clear()
-        self.source_db_combo.addItems(databases)
+        self.set_combo_items(self.source_db_combo, databases)
     
     def create_template(self):
         """Create template from selected database."""
@@ -357,13 +366,15 @@ class TemplatesTab(BaseTab):
                     return
             
             # Proceed with template creation
-            self.emit_progress_started()
-            self.db_manager.create_template(
+            self.begin_operation(self.create_template_btn, self.delete_template_btn)
+            self.db_manager.run_in_background(
+                self.db_manager.create_template,
                 source_db, 
                 template_name, 
                 template_comment,
                 preserve_qgis_projects=preserve_qgis_projects,
-                excluded_schemas=excluded_schemas
+                excluded_schemas=excluded_schemas,
+                schema_only=self.schema_only_checkbox.isChecked()
             )
             
         except Exception as e:
@@ -371,44 +382,60 @@ class TemplatesTab(BaseTab):
             self.show_warning(f"Error checking database connections: {str(e)}")
     
     def delete_template(self):
-        """Delete selected template."""
+        """Delete selected templates."""
         if not self.check_connection():
             return
         
-        current_row = self.templates_table.currentRow()
-        if current_row == -1:
-            self.show_warning("Please select a template to delete.")
-            return
+        # Get the template names from the first column of every selected row
+        template_names = []
+        for index in self.templates_table.selectionModel().selectedRows(0):
+            template_name_item = self.templates_table.item(index.row(), 0)
+            if template_name_item:
+                template_names.append(template_name_item.text())
         
-        # Get the template name from the first column
-        template_name_item = self.templates_table.item(current_row, 0)
-        if not template_name_item:
-            self.show_warning("Could not retrieve template name.")
+        if not template_names:
+            self.show_warning("Please select a template to delete.")
             return
         
-        template_name = template_name_item.text()
+        if len(template_names) == 1:
+            question = f"Are you sure you want to delete template '{template_names[0]}'?\n"
+        else:
+            question = (f"Are you sure you want to delete these {len(template_names)} templates?\n"
+                        f"{', '.join(template_names)}\n")
         
-        if self.confirm_action("Confirm Delete", 
-                              f"Are you sure you want to delete template '{template_name}'?\n"
-                              "This action cannot be undone!"):
-            self.emit_progress_started()
-            self.db_manager.delete_template(template_name)
+        if self.confirm_action("Confirm Delete", question + "This action cannot be undone!"):
+            self.begin_operation(self.create_template_btn, self.delete_template_btn,
+                                 count=len(template_names))
+            self.db_manager.run_in_background(self._delete_templates, template_names)
     
-    def on_operation_finished(self, success, message):
+    def _delete_templates(self, template_names):
+        """Drop the templates concurrently; runs on a worker thread and reports per template."""
+        # Bounded by the maintenance pool, keeping one connection free for refreshes;
+        # a thread-pool task per template could check out more than the pool allows
+        workers = min(len(template_names), ADMIN_POOL_MAX_CONNECTIONS - 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(self.db_manager.delete_template, template_names))
+    
+    def on_operation_finished(self, success, message, operation):
         """Handle operation finished signal."""
-        if any(keyword in message for keyword in ["template", "Template"]):
-            self.emit_progress_finished()
+        if operation in (OP_CREATE_TEMPLATE, OP_DELETE_TEMPLATE):
+            self.end_operation()
             
             if success:
                 self.emit_log(f"✓ {message}")
-                self.template_name_edit.clear()
-                self.template_comment_edit.clear()
-                # Reset data preservation options to defaults
-                self.protect_qgis_projects_checkbox.setChecked(True)
-                self.exclude_schemas_edit.setText("listen")
-                self.refresh_templates()
+                if operation == OP_CREATE_TEMPLATE:
+                    self.template_name_edit.clear()
+                    self.template_comment_edit.clear()
+                    # Reset data preservation options to defaults
+                    self.protect_qgis_projects_checkbox.setChecked(True)
+                    self.exclude_schemas_edit.setText("listen")
+                    self.schema_only_checkbox.setChecked(False)
             else:
                 self.emit_log(f"✗ {message}")
+            
+            # Refresh once after the last of several deletions
+            if self._pending_operations == 0:
+                self.refresh_templates()
     
     def get_template_names(self):
         """Get list of current template names."""
@@ -2,12 +2,15 @@
 Truncate Tables tab for PostgreSQL Template Manager with table truncation functionality.
 """
 
+import traceback
+
 from qgis.PyQt.QtCore import pyqtSignal, Qt
-from qgis.PyQt.QtWidgets import (QVBoxLayout, QHBoxLayout, QFormLayout, QComboBox, 
+from qgis.PyQt.QtWidgets import (QVBoxLayout, QHBoxLayout, QFormLayout, 
                                 QPushButton, QGroupBox, QLabel, QMessageBox, QDialog, 
                                 QCheckBox, QTextEdit, QFrame, QTableWidget, QTableWidgetItem,
                                 QHeaderView)
-from qgis.PyQt.QtGui import QFont
+from qgis.PyQt.QtGui import QColor, QFont
+from ..database_manager import OP_TRUNCATE
 from .base_tab import BaseTab
 
 
@@ -171,11 +174,11 @@ class TruncateTablesTab(BaseTab):
         selection_group = QGroupBox("Database and Schema Selection")
         selection_layout = QFormLayout(selection_group)
         
-        self.database_combo = QComboBox()
+        self.database_combo = self.create_list_combo()
         self.database_combo.currentTextChanged.connect(self.on_database_changed)
         selection_layout.addRow("Database:", self.database_combo)
         
-        self.schema_combo = QComboBox()
+        self.schema_combo = self.create_list_combo()
         self.schema_combo.currentTextChanged.connect(self.on_schema_changed)
         self.schema_combo.setEnabled(False)
         selection_layout.addRow("Schema:", self.schema_combo)
@@ -332,9 +335,6 @@ class TruncateTablesTab(BaseTab):
     
     def refresh_databases(self, databases):
         """Refresh available databases."""
-        current_selection = self.database_combo.currentText()
-        self.database_combo.clear()
-        
         # Filter out system databases
         available_databases = []
         for db_name in databases:
@@ -342,11 +342,8 @@ class TruncateTablesTab(BaseTab):
                 available_databases.append(db_name)
         
         self.current_databases = available_databases
-        self.database_combo.addItems(available_databases)
-        
-        # Restore previous selection if it still exists
-        if current_selection in available_databases:
-            self.database_combo.setCurrentText(current_selection)
+        # Keeps the previous selection if it still exists
+        self.set_combo_items(self.database_combo, available_databases)
     
     def refresh_schemas(self):
         """Refresh schemas for selected database."""
@@ -367,13 +364,9 @@ class TruncateTablesTab(BaseTab):
                 self.emit_log("⚠️ Warning: get_database_schemas method not found in database manager, using 'public' schema")
             
             self.current_schemas = schemas
-            self.schema_combo.clear()
-            self.schema_combo.addItems(schemas)
             self.schema_combo.setEnabled(True)
-            
             # Auto-select 'public' schema if available
-            if 'public' in schemas:
-                self.schema_combo.setCurrentText('public')
+            self.set_combo_items(self.schema_combo, schemas, select='public')
             
             self.emit_log(f"Refreshed schemas for database '{database_name}': {len(schemas)} schemas found")
             
@@ -437,7 +430,6 @@ class TruncateTablesTab(BaseTab):
                 self.status_label.setText(f"No tables found in schema '{schema_name}'")
             
         except Exception as e:
-            import traceback
             error_details = traceback.format_exc()
             self.emit_log(f"❌ Error refreshing tables: {str(e)}")
             self.emit_log(f"Full traceback: {error_details}")
@@ -450,43 +442,37 @@ class TruncateTablesTab(BaseTab):
 
     def update_tables_display(self):
         """Update the tables display with current tables and exclusions."""
-        from qgis.PyQt.QtGui import QColor, QFont
-        from qgis.PyQt.QtCore import Qt
-        
-        self.tables_table.setRowCount(0)
-        
         exclude_qgis_projects = self.exclude_qgis_projects_cb.isChecked()
         tables_to_truncate = 0
         
-        for row, table_name in enumerate(self.current_tables):
-            self.tables_table.insertRow(row)
-            
-            # Table name
-            name_item = QTableWidgetItem(table_name)
-            name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)
-            self.tables_table.setItem(row, 0, name_item)
-            
-            # Status
-            if table_name == 'qgis_projects' and exclude_qgis_projects:
-                status_item = QTableWidgetItem("EXCLUDED")
-                # Set green color for excluded items
-                status_item.setForeground(QColor("#388e3c"))  # Green color
-                # Make it bold
-                font = QFont()
-                font.setBold(True)
-                status_item.setFont(font)
-            else:
-                status_item = QTableWidgetItem("WILL BE TRUNCATED")
-                # Set red color for items to be truncated
-                status_item.setForeground(QColor("#f44336"))  # Red color
-                # Make it bold
-                font = QFont()
-                font.setBold(True)
-                status_item.setFont(font)
-                tables_to_truncate += 1
-            
-            status_item.setFlags(status_item.flags() & ~Qt.ItemIsEditable)
-            self.tables_table.setItem(row, 1, status_item)
+        # Shared by every status cell instead of building them per row
+        bold_font = QFont()
+        bold_font.setBold(True)
+        excluded_color = QColor("#388e3c")  # Green color
+        truncated_color = QColor("#f44336")  # Red color
+        
+        with self.filling_table(self.tables_table, len(self.current_tables)):
+            for row, table_name in enumerate(self.current_tables):
+                # Table name
+                name_item = QTableWidgetItem(table_name)
+                name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)
+                self.tables_table.setItem(row, 0, name_item)
+                
+                # Status
+                if table_name == 'qgis_projects' and exclude_qgis_projects:
+                    status_item = QTableWidgetItem("EXCLUDED")
+                    # Set green color for excluded items
+                    status_item.setForeground(excluded_color)
+                    status_item.setFont(bold_font)
+                else:
+                    status_item = QTableWidgetItem("WILL BE TRUNCATED")
+                    # Set red color for items to be truncated
+                    status_item.setForeground(truncated_color)
+                    status_item.setFont(bold_font)
+                    tables_to_truncate += 1
+                
+                status_item.setFlags(status_item.flags() & ~Qt.ItemIsEditable)
+                self.tables_table.setItem(row, 1, status_item)
         
         # Update truncate button state
         self.truncate_btn.setEnabled(tables_to_truncate > 0)
@@ -539,27 +525,31 @@ class TruncateTablesTab(BaseTab):
         
         if result == QDialog.Accepted:
             # User confirmed - execute truncation
-            self.emit_progress_started()
+            self.begin_operation(self.truncate_btn)
             self.emit_log(f"🗑️ TRUNCATING {len(tables_to_truncate)} table(s) in schema '{schema_name}' of database '{database_name}'")
             
             # Execute truncation via database manager
             if hasattr(self.db_manager, 'truncate_schema_tables'):
-                self.db_manager.truncate_schema_tables(database_name, schema_name, tables_to_truncate)
+                self.db_manager.run_in_background(
+                    self.db_manager.truncate_schema_tables, database_name, schema_name, tables_to_truncate
+                )
             elif hasattr(self.db_manager, 'truncate_database_tables'):
                 # Fallback: pass schema-qualified table names
                 qualified_tables = [f"{schema_name}.{table}" for table in tables_to_truncate]
-                self.db_manager.truncate_database_tables(database_name, qualified_tables)
+                self.db_manager.run_in_background(
+                    self.db_manager.truncate_database_tables, database_name, qualified_tables
+                )
             else:
                 # Fallback error
                 self.emit_log("❌ Error: Neither truncate_schema_tables nor truncate_database_tables method found in database manager")
-                self.emit_progress_finished()
+                self.end_operation()
         else:
             self.emit_log("Table truncation cancelled by user.")
     
-    def on_operation_finished(self, success, message):
+    def on_operation_finished(self, success, message, operation):
         """Handle operation finished signal."""
-        if "truncate" in message.lower():
-            self.emit_progress_finished()
+        if operation == OP_TRUNCATE:
+            self.end_operation()
             
             if success:
                 self.emit_log(f"✅ {message}")